@@ -0,0 +1,82 @@
+import json
+import os
+
+from checkpoints import capture, restore
+
+# Account data for data-driven runs, e.g. accounts.json:
+#   [{"id": "pratik", "expected": {"Name": "Pratik Wavhal", "Employee Id": "DS1342"}},
+#    {"id": "qa-two", "username": "qa.two@datafortune.com", "password_env": "DFPERF_PASSWORD_QA_TWO",
+#     "expected": {"Name": "QA Two"}}]
+# An account without a username is the identity the browser is already signed in as.
+# Passwords only ever come from the environment variable named by password_env.
+
+CLEAR_STORAGE = "localStorage.clear(); sessionStorage.clear();"
+
+
+class Secret:
+    # Keeps passwords out of Allure step parameters and tracebacks
+    def __init__(self, value):
+        self._value = value
+
+    def reveal(self):
+        return self._value
+
+    def __repr__(self):
+        return "'******'"
+
+    __str__ = __repr__
+
+
+def load_accounts(path):
+    with open(path) as source:
+        accounts = json.load(source)
+    seen = set()
+    for account in accounts:
+        if account["id"] in seen:
+            raise ValueError(f"Duplicate account id '{account['id']}' in {path}")
+        seen.add(account["id"])
+        if "password" in account:
+            raise ValueError(f"Account '{account['id']}' has a password in {path}; use password_env instead")
+        if account.get("username"):
+            if not account.get("password_env"):
+                raise ValueError(f"Account '{account['id']}' needs password_env")
+            # None when the variable is unset; that account's tests are skipped
+            password = os.environ.get(account["password_env"])
+            account["password"] = Secret(password) if password is not None else None
+        account.setdefault("expected", {})
+    return accounts
+
+
+class AccountSessions:
+    # Signed-in browser state per account: each account logs in once per process, after
+    # which switching to it restores its cookies and storage (see checkpoints.restore)
+    def __init__(self, base_url, sign_in):
+        self.base_url = base_url
+        self.sign_in = sign_in  # sign_in(driver, wait, account) for accounts with credentials
+        self.states = {}  # account id (None for the browser's own identity) -> captured state
+        self.current = {}  # driver session id -> account id
+        self.logins = {}
+
+    def _on_app(self, driver):
+        if not driver.current_url.startswith(self.base_url):
+            driver.get(self.base_url)
+
+    def activate(self, driver, wait, account):
+        key = account["id"] if account and account.get("username") else None
+        current = self.current.get(driver.session_id)
+        if current == key:
+            return
+        # Keep the outgoing account's state current; its tokens may have been refreshed
+        self._on_app(driver)
+        if current is not None or None not in self.states:
+            self.states[current] = capture(driver)
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_script(CLEAR_STORAGE)
+        if key in self.states:
+            restore(driver, self.states[key])
+        else:
+            self.sign_in(driver, wait, account)
+            self.logins[key] = self.logins.get(key, 0) + 1
+            self._on_app(driver)
+            self.states[key] = capture(driver)
+        self.current[driver.session_id] = key
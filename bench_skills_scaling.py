@@ -0,0 +1,160 @@
+import base64
+import json
+import math
+import time
+import warnings
+
+import allure
+import pytest
+from allure_commons.types import AttachmentType
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from data_lifecycle import SkillsApi, cleanup_created_skills, created_entities, skill_payload
+from resource_metrics import get_metrics
+from test_script import BASE_URL, EDIT_SKILL_XPATH, REMOVE_SKILL_XPATH, app_states
+
+# Run explicitly: pytest bench_skills_scaling.py --bench-sizes 10,100,1000 [--bench-source api --skills-payload skill.json]
+
+LAST_REMOVE_XPATH = REMOVE_SKILL_XPATH.replace("nb-list-item[1]", "nb-list-item[last()]")
+TIME_METRICS = ("first_item_ms", "edit_clickable_s", "remove_clickable_s", "all_rows_clickable_s")
+SUPERLINEAR_EXPONENT = 1.5
+
+# Records when the first nb-list-item is attached, on the page's own clock
+FIRST_ITEM_OBSERVER = """
+window.__dfperfFirstItem = null;
+new MutationObserver((mutations, observer) => {
+  if (document.querySelector('nb-list-item')) {
+    window.__dfperfFirstItem = performance.now();
+    observer.disconnect();
+  }
+}).observe(document, {childList: true, subtree: true});
+"""
+
+# Same element path as the real assign-skills page so the helpers' XPaths apply;
+# rows are appended one by one after load, like the app's *ngFor
+STANDIN_PAGE = """<!DOCTYPE html><html><head><title>Assign Skills stand-in</title></head><body>
+<ngx-app><ngx-pages><ngx-one-column-layout><nb-layout><div><div><div><div><div><nb-layout-column>
+<assign-skills><div><div><div></div><div><nb-card><nb-card-header></nb-card-header><nb-card-body>
+<div><nb-list id="skills"></nb-list></div></nb-card-body></nb-card></div></div></div></assign-skills>
+</nb-layout-column></div></div></div></div></div></nb-layout></ngx-one-column-layout></ngx-pages></ngx-app>
+<script>
+setTimeout(() => {
+  const list = document.getElementById('skills');
+  for (let i = 0; i < %d; i++) {
+    const item = document.createElement('nb-list-item');
+    item.innerHTML = '<div><span>Skill ' + i + '</span><span><span>edit</span></span>' +
+      '<span><span>remove</span></span><span><span><span>accept</span></span></span></div>';
+    list.appendChild(item);
+  }
+}, 0);
+</script></body></html>"""
+
+results = []
+
+
+def pytest_generate_tests(metafunc):
+    if "skill_count" in metafunc.fixturenames:
+        sizes = [int(n) for n in metafunc.config.getoption("--bench-sizes").split(",")]
+        metafunc.parametrize("skill_count", sizes)
+
+
+def scaling_exponent(points):
+    # Slope of log(value) against log(count): ~1 is linear, ~2 quadratic
+    points = [(math.log(n), math.log(v)) for n, v in points if n > 0 and v and v > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+@pytest.fixture(scope="module", autouse=True)
+def scaling_curve(request):
+    yield
+    if not results:
+        return
+    curve = sorted(results, key=lambda r: r["skills"])
+    exponents = {metric: scaling_exponent([(r["skills"], r[metric]) for r in curve]) for metric in TIME_METRICS}
+    report = {"source": request.config.getoption("--bench-source"), "curve": curve, "exponents": exponents}
+    with open("bench-skills-scaling.json", "w") as output:
+        json.dump(report, output, indent=2)
+    allure.attach(json.dumps(report, indent=2), name="skills_scaling_curve", attachment_type=AttachmentType.JSON)
+    # Printed here it would be swallowed by capture: conftest shows it in the terminal summary
+    request.config._bench_report = report
+    for metric, exponent in exponents.items():
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            warnings.warn(f"Assign Skills {metric} grows as n^{exponent:.2f}, worse than n^{SUPERLINEAR_EXPONENT}")
+
+
+def format_report(report):
+    # (line, superlinear) pairs: the scaling table, then one line per fitted exponent
+    columns = TIME_METRICS + ("js_heap_mb", "dom_nodes")
+    lines = [("skills  " + "  ".join(f"{m:>20}" for m in columns), False)]
+    for r in report["curve"]:
+        lines.append((f"{r['skills']:6d}  " + "  ".join(f"{str(r[m]):>20}" for m in columns), False))
+    for metric, exponent in report["exponents"].items():
+        if exponent is not None:
+            superlinear = exponent > SUPERLINEAR_EXPONENT
+            lines.append((f"{metric} grows as n^{exponent:.2f}" + (", worse than linear" if superlinear else ""),
+                          superlinear))
+    return lines
+
+
+def measure_assign_skills(driver, url):
+    driver.execute_cdp_cmd("Performance.enable", {})
+    driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    script_id = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                       {"source": FIRST_ITEM_OBSERVER})["identifier"]
+    fast = WebDriverWait(driver, 180, poll_frequency=0.05)
+    try:
+        start = time.perf_counter()
+        driver.get(url)
+        fast.until(EC.element_to_be_clickable((By.XPATH, EDIT_SKILL_XPATH)))
+        edit_ready = time.perf_counter() - start
+        fast.until(EC.element_to_be_clickable((By.XPATH, REMOVE_SKILL_XPATH)))
+        remove_ready = time.perf_counter() - start
+        fast.until(EC.element_to_be_clickable((By.XPATH, LAST_REMOVE_XPATH)))
+        all_ready = time.perf_counter() - start
+        first_item = driver.execute_script("return window.__dfperfFirstItem")
+    finally:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+    metrics = get_metrics(driver)
+    return {
+        "rendered_items": len(driver.find_elements(By.TAG_NAME, "nb-list-item")),
+        "first_item_ms": round(first_item, 1) if first_item is not None else None,
+        "edit_clickable_s": round(edit_ready, 3),
+        "remove_clickable_s": round(remove_ready, 3),
+        "all_rows_clickable_s": round(all_ready, 3),
+        "js_heap_mb": round(metrics["JSHeapUsedSize"] / (1024 * 1024), 2),
+        "dom_nodes": int(metrics["Nodes"]),
+    }
+
+
+@allure.title("Benchmark: Assign Skills rendering with {skill_count} skills")
+@allure.description("Seeds skills and measures list rendering, clickability and memory.")
+def test_assign_skills_scaling(request, setup, skill_count):
+    driver, wait = setup
+    if request.config.getoption("--bench-source") == "standin":
+        page = STANDIN_PAGE % skill_count
+        url = "data:text/html;base64," + base64.b64encode(page.encode()).decode()
+        result = measure_assign_skills(driver, url)
+    else:
+        app_states.navigate_to(driver, wait, "dashboard", fresh=False)
+        api = SkillsApi(driver, BASE_URL, request.config.getoption("--skills-api"))
+        existing = len(api.list())
+        for index in range(max(skill_count - existing, 0)):
+            api.create(skill_payload(index, request.config._skill_template))
+            created_entities.track("skill")
+        try:
+            result = measure_assign_skills(driver, BASE_URL + app_states.states["assign-skills"].route)
+        finally:
+            cleanup_created_skills(api, driver, wait)
+    result["skills"] = skill_count
+    results.append(result)
+    allure.attach(json.dumps(result, indent=2), name=f"scaling_{skill_count}", attachment_type=AttachmentType.JSON)
+    assert result["rendered_items"] >= skill_count, f"Only {result['rendered_items']} of {skill_count} skills rendered"
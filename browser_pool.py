@@ -0,0 +1,220 @@
+import json
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    import psutil  # Optional, gives RSS for the whole Chrome process tree
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _proc_rss(pid):
+    # Fallback when psutil is missing: walk /proc for the process and its children
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                total += _proc_rss(int(child))
+    except (OSError, ValueError):
+        pass
+    return total
+
+
+def launch_chrome(chrome_binary, port, profile_dir, timeout=30):
+    # Start a headless Chrome with remote debugging and wait until it answers
+    process = subprocess.Popen(
+        [chrome_binary, f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+         "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--headless",
+         "--window-size=1920,1080", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while not debugger_ready(port):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Chrome failed to start on port {port}")
+        time.sleep(0.2)
+    return process
+
+
+def debugger_ready(port):
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/json/version", timeout=1) as response:
+            json.load(response)
+        return True
+    except OSError:
+        return False
+
+
+class PooledBrowser:
+    def __init__(self, process, port, profile_dir, driver):
+        self.process = process
+        self.port = port
+        self.profile_dir = profile_dir
+        self.driver = driver
+        self.tests_run = 0
+
+    @property
+    def debugger_address(self):
+        return f"localhost:{self.port}"
+
+    def healthy(self):
+        if self.process.poll() is not None:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def js_heap_bytes(self):
+        return self.driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"]
+
+    def rss_bytes(self):
+        if psutil is None:
+            return _proc_rss(self.process.pid)
+        try:
+            root = psutil.Process(self.process.pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+        except psutil.Error:
+            return 0
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    # Keeps `size` Chrome instances warm. Instances are recycled after `max_tests`
+    # tests or once their JS heap / RSS crosses a threshold; replacements are
+    # launched on a background thread so the next test never waits on startup.
+    def __init__(self, size=2, max_tests=10, max_heap_mb=512, max_rss_mb=1536,
+                 chrome_binary="google-chrome-stable", profile_template=None):
+        self.size = size
+        self.max_tests = max_tests
+        self.max_heap_bytes = max_heap_mb * MB
+        self.max_rss_bytes = max_rss_mb * MB
+        self.chrome_binary = chrome_binary
+        self.profile_template = profile_template
+        self.driver_path = ChromeDriverManager().install()  # Resolve once for the whole pool
+        self.idle = queue.Queue()
+        self.launchers = []
+        self.closed = False
+        for _ in range(size):
+            self._replace()
+
+    def _launch(self):
+        port = _free_port()
+        profile_dir = tempfile.mkdtemp(prefix="dfperf-chrome-")
+        if self.profile_template:
+            # Copy a signed-in profile so pooled instances share the Microsoft session
+            shutil.copytree(self.profile_template, profile_dir, dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns("Singleton*", "*.lock"))
+        try:
+            process = launch_chrome(self.chrome_binary, port, profile_dir)
+        except RuntimeError:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+        opt = Options()
+        opt.add_experimental_option("debuggerAddress", f"localhost:{port}")
+        driver = webdriver.Chrome(service=Service(self.driver_path), options=opt)
+        return PooledBrowser(process, port, profile_dir, driver)
+
+    def _launch_into_pool(self, retired=None):
+        if retired is not None:
+            retired.close()  # Off the test's thread; quitting Chrome takes seconds
+        try:
+            browser = self._launch()
+        except Exception as e:
+            # Handed to the next acquire() so the failure surfaces instead of a timeout
+            print(f"Browser pool: launch failed: {e}")
+            self.idle.put(e)
+            return
+        if self.closed:
+            browser.close()
+        else:
+            self.idle.put(browser)
+
+    def _replace(self, retired=None):
+        launcher = threading.Thread(target=self._launch_into_pool, args=(retired,), daemon=True)
+        launcher.start()
+        self.launchers = [t for t in self.launchers if t.is_alive()] + [launcher]
+
+    def acquire(self, timeout=120):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("No healthy browser became available in the pool")
+            try:
+                browser = self.idle.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if isinstance(browser, Exception):
+                raise RuntimeError("Browser pool could not launch a replacement browser") from browser
+            if browser.healthy():
+                return browser
+            # Crashed since it was parked; swap it out transparently
+            print(f"Browser pool: replacing crashed instance on port {browser.port}")
+            self._replace(retired=browser)
+
+    def needs_recycle(self, browser):
+        if browser.tests_run >= self.max_tests:
+            return "test count"
+        try:
+            if browser.js_heap_bytes() > self.max_heap_bytes:
+                return "JS heap"
+        except Exception:
+            return "unresponsive"
+        if browser.rss_bytes() > self.max_rss_bytes:
+            return "RSS"
+        return None
+
+    def release(self, browser):
+        browser.tests_run += 1
+        reason = None if browser.healthy() else "crashed"
+        reason = reason or self.needs_recycle(browser)
+        if reason:
+            print(f"Browser pool: recycling instance on port {browser.port} ({reason})")
+            self._replace(retired=browser)
+        else:
+            self.idle.put(browser)
+
+    def close(self):
+        self.closed = True
+        for launcher in self.launchers:
+            launcher.join(timeout=30)
+        while not self.idle.empty():
+            browser = self.idle.get_nowait()
+            if not isinstance(browser, Exception):
+                browser.close()
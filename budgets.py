@@ -0,0 +1,202 @@
+import json
+import os
+import re
+
+import allure
+
+from step_hooks import StepCheckFailed, add_step_parameter
+
+# Declarative performance budgets checked as each step finishes, e.g. budgets.json:
+#   {"mode": "warn",
+#    "defaults": {"max_duration_s": 60},
+#    "steps": {"sign_in_to_dashboard": {"max_duration_s": 20, "max_requests": 150}},
+#    "pages": {"dashboard": {"url": "/pages/dashboard", "max_lcp_ms": 4000, "mode": "fail"}}}
+# Step budgets apply to the helper of that name, page budgets to every step that
+# ends on a URL matching the `url` regex. Later sources override earlier ones:
+# defaults, then pages, then the step itself. max_lcp_ms is only checked on the step
+# that loaded the document and max_js_heap_mb only on steps that grew the heap. A step
+# that called other steps is only checked for its duration; its page metrics belong
+# to the innermost step.
+LIMITS = {
+    "max_duration_s": ("duration", "s"),
+    "max_lcp_ms": ("lcp_ms", "ms"),
+    "max_transfer_kb": ("transfer_kb", "KB"),
+    "max_requests": ("requests", ""),
+    "max_js_heap_mb": ("js_heap_mb", "MB"),
+}
+MODES = ("fail", "warn")
+CATEGORY = "Performance budget exceeded"
+
+# Largest contentful paint plus Resource Timing totals for the current document;
+# transferSize is 0 for cross-origin responses without Timing-Allow-Origin
+PAGE_OBSERVER = """
+if (!window.__dfperfLcp) {
+  window.__dfperfLcp = {value: null};
+  try { performance.setResourceTimingBufferSize(100000); } catch (e) {}
+  try {
+    new PerformanceObserver(list => {
+      const entries = list.getEntries();
+      window.__dfperfLcp.value = entries[entries.length - 1].startTime;
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+  } catch (e) {}
+}
+"""
+READ_PAGE = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let transfer = 0;
+for (const entry of entries) transfer += entry.transferSize || 0;
+return {origin: performance.timeOrigin, lcp: window.__dfperfLcp ? window.__dfperfLcp.value : null,
+        transfer: transfer, requests: entries.length};
+"""
+
+
+class BudgetExceeded(StepCheckFailed):
+    pass
+
+
+class BudgetWarning(Exception):
+    # Raised inside a nested Allure step so warnings show up as "broken" steps
+    pass
+
+
+def load_budgets(path, mode=None):
+    with open(path) as source:
+        budgets = json.load(source)
+    scopes = [budgets, budgets.get("defaults", {})]
+    scopes += list(budgets.get("steps", {}).values()) + list(budgets.get("pages", {}).values())
+    for scope in scopes:
+        if mode:
+            scope.pop("mode", None)  # --budget-mode overrides every scope
+        if scope.get("mode", "warn") not in MODES:
+            raise ValueError(f"Budget mode must be one of {', '.join(MODES)}, got '{scope['mode']}'")
+        unknown = set(scope) - set(LIMITS) - {"mode", "url", "defaults", "steps", "pages"}
+        if unknown:
+            raise ValueError(f"Unknown budget keys in {path}: {', '.join(sorted(unknown))}")
+    budgets["mode"] = mode or budgets.get("mode", "warn")
+    for page in budgets.get("pages", {}).values():
+        page["pattern"] = re.compile(page.get("url", "."))
+    return budgets
+
+
+def limits_for(budgets, step, url):
+    # Returns {limit: (value, mode, source)}
+    limits = {}
+    scopes = [("defaults", budgets.get("defaults", {}))]
+    scopes += [(f"page {name}", page) for name, page in budgets.get("pages", {}).items()
+               if page["pattern"].search(url or "")]
+    scopes += [(f"step {step}", budgets.get("steps", {}).get(step, {}))]
+    for source, scope in scopes:
+        mode = scope.get("mode", budgets["mode"])
+        for limit in LIMITS:
+            if limit in scope:
+                limits[limit] = (scope[limit], mode, source)
+    return limits
+
+
+def check(measured, limits):
+    violations = []
+    for limit, (value, mode, source) in limits.items():
+        field, unit = LIMITS[limit]
+        actual = measured.get(field)
+        if actual is not None and actual > value:
+            violations.append({"metric": field, "actual": actual, "limit": value, "unit": unit,
+                               "mode": mode, "source": source})
+    return violations
+
+
+def describe(violation):
+    unit = violation["unit"]
+    return (f"{violation['metric']} {violation['actual']}{unit} > {violation['limit']}{unit} "
+            f"({violation['source']})")
+
+
+def write_categories(results_dir):
+    # Allure groups failures matching these categories separately from product defects
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, "categories.json")
+    try:
+        with open(path) as existing:
+            categories = json.load(existing)
+    except (OSError, ValueError):
+        categories = []
+    if not any(category.get("name") == CATEGORY for category in categories):
+        categories.insert(0, {"name": CATEGORY, "messageRegex": f".*{CATEGORY}.*",
+                              "matchedStatuses": ["failed", "broken"]})
+        with open(path, "w") as output:
+            json.dump(categories, output, indent=2)
+
+
+class BudgetChecker:
+    # Step observer measuring each step against the budgets file as it finishes
+    def __init__(self, budgets):
+        self.budgets = budgets
+        self.installed = set()
+        self.before = {}
+        self.open = {}  # session id -> before-readings of the steps in progress, outermost first
+        self.violations = []
+
+    def _install(self, driver):
+        if driver.session_id not in self.installed:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PAGE_OBSERVER})
+            self.installed.add(driver.session_id)
+        driver.execute_script(PAGE_OBSERVER)
+
+    def before_step(self, driver, name):
+        self._install(driver)
+        before = driver.execute_script(READ_PAGE)
+        before["heap"] = driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"]
+        stack = self.open.setdefault(driver.session_id, [])
+        for outer in stack:
+            outer["nested"] = True  # This step's page metrics count for it, not its callers
+        stack.append(before)
+        self.before[(driver.session_id, name)] = before
+
+    def measure(self, driver, before, record):
+        # LCP belongs to the step that loaded the document and the heap to a step that
+        # grew it; otherwise every later step on that page would repeat the violation
+        if before.get("nested"):
+            return {"duration": record["duration"], "lcp_ms": None, "transfer_kb": None, "requests": None,
+                    "js_heap_mb": None}
+        after = driver.execute_script(READ_PAGE)
+        loaded = after["origin"] != before["origin"]
+        heap = driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"]
+        if loaded:
+            before = dict(before, transfer=0, requests=0)
+        return {
+            "duration": record["duration"],
+            "lcp_ms": round(after["lcp"]) if loaded and after["lcp"] is not None else None,
+            "transfer_kb": round((after["transfer"] - before["transfer"]) / 1024, 1),
+            "requests": after["requests"] - before["requests"],
+            "js_heap_mb": round(heap / 1024 / 1024, 1) if heap > before["heap"] else None,
+        }
+
+    def after_step(self, driver, name, record, error):
+        before = self.before.pop((driver.session_id, name), None)
+        stack = self.open.get(driver.session_id, [])
+        if stack and stack[-1] is before:
+            stack.pop()
+        if before is None or error is not None:
+            return
+        limits = limits_for(self.budgets, name, driver.current_url)
+        if not limits:
+            return
+        measured = self.measure(driver, before, record)
+        record["budget_metrics"] = measured
+        violations = check(measured, limits)
+        if not violations:
+            return
+        record["budget_violations"] = violations
+        self.violations += [dict(violation, test=record["test"], step=name) for violation in violations]
+        add_step_parameter("budget", "; ".join(describe(v) for v in violations))
+        allure.dynamic.tag("budget-exceeded")
+
+        failing = [v for v in violations if v["mode"] == "fail"]
+        warning = [v for v in violations if v["mode"] == "warn"]
+        if warning:
+            try:
+                with allure.step(f"Budget warning: {'; '.join(describe(v) for v in warning)}"):
+                    raise BudgetWarning(f"{CATEGORY} (warn): {'; '.join(describe(v) for v in warning)}")
+            except BudgetWarning:
+                pass
+        if failing:
+            raise BudgetExceeded(f"{CATEGORY} in '{record['title']}': {'; '.join(describe(v) for v in failing)}")
@@ -0,0 +1,114 @@
+import itertools
+import json
+import queue
+import threading
+import urllib.request
+
+import websocket  # websocket-client, installed with selenium
+
+# Direct DevTools websocket session to the page a WebDriver is controlling. Unlike
+# driver.execute_cdp_cmd it also delivers events (Tracing.tracingComplete,
+# Runtime.consoleAPICalled, ...).
+
+
+class CdpError(RuntimeError):
+    pass
+
+
+def debugger_address(driver):
+    return driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+
+def page_websocket_url(driver):
+    with urllib.request.urlopen(f"http://{debugger_address(driver)}/json/list", timeout=5) as response:
+        targets = [t for t in json.load(response) if t.get("type") == "page"]
+    # chromedriver window handles are DevTools target ids
+    handle = driver.current_window_handle
+    for target in targets:
+        if target["id"] == handle:
+            return target["webSocketDebuggerUrl"]
+    if not targets:
+        raise CdpError("No page target found on the debugger address")
+    return targets[0]["webSocketDebuggerUrl"]
+
+
+class CdpSession:
+    def __init__(self, ws_url):
+        self.ws = websocket.create_connection(ws_url, suppress_origin=True, enable_multithread=True)
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listeners = {}
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    @classmethod
+    def for_driver(cls, driver):
+        return cls(page_websocket_url(driver))
+
+    def _read(self):
+        while True:
+            try:
+                message = json.loads(self.ws.recv())
+            except (websocket.WebSocketException, OSError, ValueError):
+                break
+            if "id" in message:
+                waiter = self.pending.pop(message["id"], None)
+                if waiter is not None:
+                    waiter.put(message)
+            else:
+                for callback in list(self.listeners.get(message.get("method"), ())):
+                    try:
+                        callback(message.get("params", {}))
+                    except Exception as e:
+                        print(f"CDP listener for {message.get('method')} failed: {e}")
+        for waiter in self.pending.values():
+            waiter.put({"error": {"message": "CDP connection closed"}})
+
+    def send(self, method, params=None, timeout=60):
+        command_id = next(self.ids)
+        waiter = queue.Queue(maxsize=1)
+        self.pending[command_id] = waiter
+        with self.lock:
+            self.ws.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        try:
+            response = waiter.get(timeout=timeout)
+        except queue.Empty:
+            self.pending.pop(command_id, None)
+            raise CdpError(f"{method} timed out after {timeout}s")
+        if "error" in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def off(self, event, callback):
+        if callback in self.listeners.get(event, []):
+            self.listeners[event].remove(callback)
+
+    def expect(self, event):
+        # Subscribe before triggering the event; call the returned function to wait
+        received = queue.Queue(maxsize=1)
+
+        def callback(params):
+            if received.empty():
+                received.put(params)
+
+        self.on(event, callback)
+
+        def wait(timeout=60):
+            try:
+                return received.get(timeout=timeout)
+            except queue.Empty:
+                raise CdpError(f"Timed out waiting for {event}")
+            finally:
+                self.off(event, callback)
+
+        return wait
+
+    def close(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
@@ -0,0 +1,213 @@
+import json
+import os
+import re
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from step_hooks import add_step_parameter
+
+# Restorable state after every successful top-level step of a test: URL, cookies,
+# local/session storage and the values of form fields on the page. A failed test's
+# checkpoints stay on disk; with --resume its rerun stands in for the steps it already
+# passed instead of running them (see CheckpointRecorder.plan_resume). Only steps
+# whose status line was recorded can be stood in for, and verify_* steps always run.
+# A checkpoint taken while a dialog (CDK overlay) is open cannot be reached from a
+# URL: the steps that opened and used the dialog run again after the last URL
+# restore, except steps that only changed form fields, whose values are applied.
+
+CAPTURE = """
+const path = el => {
+  const parts = [];
+  for (; el && el.nodeType === 1; el = el.parentNode) {
+    let index = 1;
+    for (let sibling = el.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+      if (sibling.nodeName === el.nodeName) index += 1;
+    }
+    parts.unshift(el.nodeName.toLowerCase() + '[' + index + ']');
+  }
+  return '/' + parts.join('/');
+};
+const dump = storage => Object.fromEntries(Object.keys(storage).map(key => [key, storage.getItem(key)]));
+const fields = [];
+for (const el of document.querySelectorAll('input, textarea, select')) {
+  if (['hidden', 'password', 'file', 'submit', 'button', 'reset'].includes(el.type)) continue;
+  const checkable = el.type === 'checkbox' || el.type === 'radio';
+  if (checkable ? el.checked === el.defaultChecked : el.value === (el.defaultValue || '')) continue;
+  fields.push({path: path(el), value: checkable ? el.checked : el.value});
+}
+const overlay = document.querySelector('.cdk-overlay-container');
+return {
+  url: location.href,
+  local: dump(localStorage),
+  session: dump(sessionStorage),
+  fields: fields,
+  restorable: !(overlay && overlay.children.length),
+};
+"""
+# Installed only while the checkpoint URL loads, so storage is in place before the app boots
+SEED_STORAGE = """
+if (location.origin === %(origin)s) {
+  const local = %(local)s, session = %(session)s;
+  for (const key in local) localStorage.setItem(key, local[key]);
+  for (const key in session) sessionStorage.setItem(key, session[key]);
+}
+"""
+APPLY_FIELDS = """
+const fields = arguments[0];
+let applied = 0;
+for (const field of fields) {
+  const el = document.evaluate(field.path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (!el) continue;
+  if (typeof field.value === 'boolean') {
+    el.checked = field.value;
+  } else {
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, field.value);  // Through the prototype setter so framework bindings notice
+  }
+  el.dispatchEvent(new Event('input', {bubbles: true}));
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+  applied += 1;
+}
+return applied === fields.length;
+"""
+
+
+class CheckpointMismatch(RuntimeError):
+    pass
+
+
+def _origin(url):
+    match = re.match(r"[a-z]+://[^/]+", url)
+    return match.group(0) if match else url
+
+
+def capture(driver):
+    state = driver.execute_script(CAPTURE)
+    state["cookies"] = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    return state
+
+
+def apply_fields(driver, fields, timeout=30):
+    if fields:
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script(APPLY_FIELDS, fields))
+
+
+def restore(driver, state, timeout=30):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": [
+        {key: value for key, value in cookie.items() if key not in ("size", "session")}
+        for cookie in state["cookies"]
+    ]})
+    seed = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SEED_STORAGE % {
+        "origin": json.dumps(_origin(state["url"])),
+        "local": json.dumps(state["local"]), "session": json.dumps(state["session"]),
+    }})
+    try:
+        driver.get(state["url"])
+    finally:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": seed["identifier"]})
+    apply_fields(driver, state["fields"], timeout)
+
+
+def _skippable(checkpoint):
+    # A stand-in returns the recorded status line, so the step must have had one;
+    # verification steps are the point of the test and always run
+    return checkpoint["result"] is not None and not checkpoint["step"].startswith("verify_")
+
+
+def plan_resume(saved):
+    # One action per saved checkpoint, in step order:
+    #   restore  stand in for the step and bring back its checkpoint from the URL
+    #   fill     stand in for a step that only changed form fields by applying them
+    #   skip     stand in without touching the page; a later restore or fill covers it
+    #   replay   run the step again (verification steps, dialog-opening clicks)
+    actions = []
+    for i, checkpoint in enumerate(saved):
+        state, previous = checkpoint["state"], saved[i - 1]["state"] if i else None
+        if not _skippable(checkpoint):
+            actions.append("replay")
+        elif state["restorable"]:
+            actions.append("restore")
+        elif previous is not None and previous["url"] == state["url"] and previous["fields"] != state["fields"]:
+            actions.append("fill")
+        else:
+            actions.append("replay")
+    for i, (action, following) in enumerate(zip(actions[:-1], actions[1:])):
+        if action in ("restore", "fill") and (following == "restore" or following == action == "fill"):
+            actions[i] = "skip"
+    # Nothing is gained by planning the steps after the last stand-in
+    while actions and actions[-1] == "replay":
+        actions.pop()
+    return [dict(checkpoint, action=action) for checkpoint, action in zip(saved, actions)]
+
+
+class CheckpointRecorder:
+    # Step observer; `skip_step` stands in for the steps a resumed test already passed
+    def __init__(self, directory=".checkpoints", resume=False):
+        self.directory = directory
+        self.resume = resume
+        self.test = None
+        self.checkpoints = []
+        self.plan = []  # Checkpoints of the previous run still to be skipped or replayed
+        self.depth = {}
+
+    def path(self, test):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]+", "_", test) + ".json")
+
+    def begin(self, test):
+        self.test, self.checkpoints, self.plan = test, [], []
+        if not os.path.exists(self.path(test)):
+            return
+        if not self.resume:
+            os.remove(self.path(test))  # Stale from an earlier run
+            return
+        with open(self.path(test)) as source:
+            self.plan = plan_resume(json.load(source))
+
+    def finish(self, test, passed):
+        if passed and os.path.exists(self.path(test)):
+            os.remove(self.path(test))
+        self.test, self.plan = None, []
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(self.test), "w") as output:
+            json.dump(self.checkpoints, output)
+
+    def skip_step(self, driver, name):
+        if not self.plan or self.depth.get(driver.session_id):
+            return None
+        checkpoint = self.plan.pop(0)
+        if checkpoint["step"] != name:
+            self.plan = []
+            if os.path.exists(self.path(self.test)):
+                os.remove(self.path(self.test))
+            raise CheckpointMismatch(f"Checkpoint for {self.test} expected step '{checkpoint['step']}' "
+                                     f"but the test called '{name}'; it has been discarded, rerun the test")
+        action = checkpoint.pop("action")
+        if action == "replay":
+            return None  # Runs normally; step_passed records its new checkpoint
+        self.checkpoints.append(checkpoint)
+        if action == "restore":
+            restore(driver, checkpoint["state"])
+            add_step_parameter("resumed", f"restored checkpoint {len(self.checkpoints)} ({checkpoint['state']['url']})")
+        elif action == "fill":
+            apply_fields(driver, checkpoint["state"]["fields"])
+            add_step_parameter("resumed", f"applied {len(checkpoint['state']['fields'])} saved form field(s)")
+        else:
+            add_step_parameter("resumed", "skipped, passed in the previous run")
+        return {"result": checkpoint["result"]}
+
+    def before_step(self, driver, name):
+        self.depth[driver.session_id] = self.depth.get(driver.session_id, 0) + 1
+
+    def after_step(self, driver, name, record, error):
+        self.depth[driver.session_id] -= 1
+
+    def step_passed(self, driver, name, record):
+        # Only once every observer's check passed: a step failed by a budget or a JS
+        # error must not be stood in for on --resume
+        if self.depth[driver.session_id] or self.test is None:
+            return
+        self.checkpoints.append({"step": name, "result": record.get("result"), "state": capture(driver)})
+        self._save()
@@ -0,0 +1,413 @@
+import contextlib
+import json
+
+import allure
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+import step_hooks
+
+measured_durations = {}
+browser_tests = set()  # nodeids of tests that drive the browser, the only ones worth balancing shards on
+matrix_runs = {}  # nodeid -> {dimension: value} for tests parametrised by a run matrix
+matrix_results = {}  # dimension -> flow -> value -> {"outcome", "duration"}
+account_tables = {}  # account id -> verification rows reported by the test
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("dfperformance")
+    group.addoption("--browser-pool", type=int, default=0,
+                    help="Number of warm Chrome instances to pool (0 attaches to localhost:9014)")
+    group.addoption("--pool-max-tests", type=int, default=10,
+                    help="Recycle a pooled browser after this many tests")
+    group.addoption("--pool-max-heap-mb", type=float, default=512,
+                    help="Recycle a pooled browser once its JS heap exceeds this size")
+    group.addoption("--pool-max-rss-mb", type=float, default=1536,
+                    help="Recycle a pooled browser once its process tree RSS exceeds this size")
+    group.addoption("--chrome-binary", default="google-chrome-stable",
+                    help="Chrome executable used to launch pooled browsers")
+    group.addoption("--chrome-profile", default=None,
+                    help="Signed-in Chrome user-data-dir copied into each pooled browser")
+    group.addoption("--resource-metrics", action="store_true",
+                    help="Record CDP Performance.getMetrics deltas for every step")
+    group.addoption("--step-timings", default=None, metavar="PATH",
+                    help="Write per-step timings (and metrics) as JSON to PATH")
+    group.addoption("--skills-baseline", type=int, default=None,
+                    help="Reset the account to this many skills before the run")
+    group.addoption("--skills-api", default="/api/skills",
+                    help="Path of the app's skills API used for seeding and cleanup")
+    group.addoption("--skills-payload", default=None, metavar="PATH",
+                    help="JSON body for creating a skill through the skills API, with \"{description}\" "
+                         "as the description value; needed to seed skills")
+    group.addoption("--daemon", action="store_true",
+                    help="Attach to the warm session kept by driver_daemon.py when it is running")
+    group.addoption("--shard-count", type=int, default=1,
+                    help="Split the collected tests into this many duration-balanced shards")
+    group.addoption("--shard-index", type=int, default=0,
+                    help="Zero-based shard to run with --shard-count")
+    group.addoption("--durations-file", default=".test-durations.json",
+                    help="Historical per-test durations used to balance shards")
+    group.addoption("--no-dom-snapshots", action="store_true",
+                    help="Don't attach DOM snapshots and locator diagnosis on failures")
+    group.addoption("--network-profiles", default=None, metavar="PROFILES",
+                    help="Run network_matrix flows under each profile, e.g. none,slow-3g,fast-3g,4g,offline "
+                         "or custom:latency=300,down=1000,up=500")
+    group.addoption("--cpu-throttling", default=None, metavar="RATES",
+                    help="Run cpu_matrix flows at each CPU slowdown factor, e.g. 1,4,6")
+    group.addoption("--trace-steps", default=None, metavar="STEPS",
+                    help="Comma-separated step helpers to record in a Chrome trace, e.g. click_self_evaluation_button")
+    group.addoption("--trace-dir", default="traces", help="Where raw traces are kept for the DevTools viewer")
+    group.addoption("--budgets", default=None, metavar="PATH",
+                    help="Check every step against the performance budgets in this JSON file, e.g. budgets.json")
+    group.addoption("--budget-mode", choices=("fail", "warn"), default=None,
+                    help="Override the mode in the budgets file: fail the step, or mark it with a broken sub-step")
+    group.addoption("--console-capture", action="store_true",
+                    help="Stream browser console messages and JS exceptions over CDP and attach them per step")
+    group.addoption("--console-buffer", type=int, default=1000,
+                    help="Ring buffer size for captured console messages")
+    group.addoption("--fail-on-js-errors", action="store_true",
+                    help="Fail a step when the page throws an uncaught JS exception during it (implies --console-capture)")
+    group.addoption("--fast-cdp", choices=("off", "on", "compare"), default="off",
+                    help="Send helper clicks, typing, queries and screenshots straight to Chrome's DevTools "
+                         "websocket (on), or alternate with Selenium to measure the saving (compare)")
+    group.addoption("--checkpoints", action="store_true",
+                    help="Save URL, cookies, storage and form values after every passing step of a test")
+    group.addoption("--resume", action="store_true",
+                    help="Resume failed tests from their saved checkpoints (implies --checkpoints)")
+    group.addoption("--checkpoint-dir", default=".checkpoints", help="Where failed tests' checkpoints are kept")
+    group.addoption("--accounts", default=None, metavar="PATH",
+                    help="Run account-parametrised tests once per account in this JSON data file, e.g. accounts.json")
+    group.addoption("--bench-sizes", default="10,100,1000",
+                    help="Comma-separated skill counts for bench_skills_scaling.py")
+    group.addoption("--bench-source", choices=("standin", "api"), default="standin",
+                    help="Seed skills into a local stand-in page or the real account via the API")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "network_matrix: run this flow under every --network-profiles profile")
+    config.addinivalue_line("markers", "cpu_matrix: run this flow at every --cpu-throttling rate")
+    config.addinivalue_line("markers", "xdist_group(name): keep an --accounts account's tests on one xdist worker")
+    shard_count, shard_index = config.getoption("--shard-count"), config.getoption("--shard-index")
+    if shard_count > 1 and not 0 <= shard_index < shard_count:
+        raise pytest.UsageError(f"--shard-index must be between 0 and {shard_count - 1} for --shard-count {shard_count}")
+    if config.getoption("--network-profiles"):
+        from network_profiles import parse_profiles
+        config._network_profiles = parse_profiles(config.getoption("--network-profiles"))
+    if config.getoption("--cpu-throttling"):
+        from cpu_throttling import LongTaskCollector, parse_rates
+        config._cpu_rates = parse_rates(config.getoption("--cpu-throttling"))
+        step_hooks.register(LongTaskCollector())
+    if not config.getoption("--no-dom-snapshots"):
+        from dom_snapshot import DomSnapshotOnFailure
+        step_hooks.register(DomSnapshotOnFailure())
+    if config.getoption("--trace-steps"):
+        from tracing import StepTracer
+        steps = [name.strip() for name in config.getoption("--trace-steps").split(",") if name.strip()]
+        step_hooks.register(StepTracer(steps, config.getoption("--trace-dir")))
+    if config.getoption("--resource-metrics"):
+        from resource_metrics import ResourceMetricsCollector
+        config._resource_metrics = step_hooks.register(ResourceMetricsCollector())
+    if config.getoption("--console-capture") or config.getoption("--fail-on-js-errors"):
+        from console_capture import ConsoleCapture
+        config._console_capture = step_hooks.register(
+            ConsoleCapture(config.getoption("--console-buffer"), config.getoption("--fail-on-js-errors")))
+    if config.getoption("--fast-cdp") != "off":
+        import fast_cdp
+        if fast_cdp.websockets is None:
+            raise pytest.UsageError("--fast-cdp needs the websockets package (pip install websockets)")
+        fast_cdp.mode = config.getoption("--fast-cdp")
+    if config.getoption("--checkpoints") or config.getoption("--resume"):
+        from checkpoints import CheckpointRecorder
+        config._checkpoints = step_hooks.register(
+            CheckpointRecorder(config.getoption("--checkpoint-dir"), config.getoption("--resume")))
+    if config.getoption("--accounts"):
+        from accounts import load_accounts
+        config._accounts = load_accounts(config.getoption("--accounts"))
+    if config.getoption("--skills-payload"):
+        from data_lifecycle import load_skill_template
+        config._skill_template = load_skill_template(config.getoption("--skills-payload"))
+    elif config.getoption("--bench-source") == "api":
+        raise pytest.UsageError("--bench-source api needs --skills-payload to create skills through the API")
+    if config.getoption("--budgets"):
+        from budgets import BudgetChecker, load_budgets
+        budgets = load_budgets(config.getoption("--budgets"), config.getoption("--budget-mode"))
+        config._budgets = step_hooks.register(BudgetChecker(budgets))
+
+
+# marker -> (indirect fixture, config attribute holding the matrix values)
+MATRICES = {
+    "network_matrix": ("network_profile", "_network_profiles"),
+    "cpu_matrix": ("cpu_throttling", "_cpu_rates"),
+}
+
+
+def pytest_generate_tests(metafunc):
+    for marker, (fixture, values) in MATRICES.items():
+        values = getattr(metafunc.config, values, None)
+        if values and metafunc.definition.get_closest_marker(marker):
+            metafunc.parametrize(fixture, list(values), indirect=True)
+    if "account" in metafunc.fixturenames:
+        # Without --accounts the parameter set is empty and the test is skipped
+        accounts = getattr(metafunc.config, "_accounts", [])
+        metafunc.parametrize("account", accounts, ids=[account["id"] for account in accounts])
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        account = getattr(item, "callspec", None) and item.callspec.params.get("account")
+        if isinstance(account, dict):  # Without --accounts the empty parameter set holds NOTSET
+            # With pytest-xdist --dist loadgroup, all of an account's tests share a worker and its login
+            item.add_marker(pytest.mark.xdist_group(f"account-{account['id']}"))
+    shard_count = config.getoption("--shard-count")
+    if shard_count <= 1:
+        return
+    import sharding
+    durations = sharding.load_durations(config.getoption("--durations-file"))
+    shards, loads = sharding.assign_shards(sharding.prefix_groups(items), durations, shard_count)
+    index = config.getoption("--shard-index")
+    selected = {item.nodeid for item in shards[index]}
+    deselected = [item for item in items if item.nodeid not in selected]
+    items[:] = [item for item in items if item.nodeid in selected]
+    config.hook.pytest_deselected(items=deselected)
+    print(f"\nShard {index + 1}/{shard_count}: {len(items)} tests, ~{loads[index]:.1f}s expected")
+
+
+def pytest_runtest_logreport(report):
+    for name, value in report.user_properties:
+        if name == "account_table" and report.when == "call":
+            account_tables[value["account"]] = value["rows"]
+    if getattr(report, "uses_browser", False):
+        browser_tests.add(report.nodeid)
+    if report.when in ("setup", "call") and not report.skipped:
+        measured_durations[report.nodeid] = measured_durations.get(report.nodeid, 0.0) + report.duration
+    if report.nodeid in matrix_runs and (report.when == "call" or report.failed):
+        runs = matrix_runs[report.nodeid]
+        for dimension, value in runs.items():
+            # Other dimensions' values stay in the row label when matrices are combined
+            others = " ".join(f"{d}={v}" for d, v in runs.items() if d != dimension)
+            flow = report.nodeid.split("::")[-1].split("[")[0] + (f" [{others}]" if others else "")
+            matrix_results.setdefault(dimension, {}).setdefault(flow, {})[value] = {
+                "outcome": report.outcome if report.when == "call" else "error",
+                "duration": measured_durations.get(report.nodeid, report.duration),
+            }
+
+
+def pytest_sessionfinish(session):
+    capture = getattr(session.config, "_console_capture", None)
+    if capture:
+        capture.close()
+    if session.config.getoption("--fast-cdp") != "off":
+        import fast_cdp
+        fast_cdp.close()
+    results_dir = getattr(session.config.option, "allure_report_dir", None)
+    if session.config.getoption("--budgets") and results_dir and not hasattr(session.config, "workerinput"):
+        # Written at the end: allure's --clean-alluredir empties the directory after our pytest_configure
+        from budgets import write_categories
+        write_categories(results_dir)
+    durations = {nodeid: duration for nodeid, duration in measured_durations.items() if nodeid in browser_tests}
+    if durations and not hasattr(session.config, "workerinput"):
+        import sharding
+        sharding.save_durations(session.config.getoption("--durations-file"), durations)
+
+
+def pytest_runtest_setup(item):
+    step_hooks.current_test = item.nodeid
+    recorder = getattr(item.config, "_checkpoints", None)
+    if recorder:
+        recorder.begin(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Set on the report so it reaches the xdist controller; unit tests stay out of the durations file
+    report.uses_browser = "setup" in item.fixturenames
+    recorder = getattr(item.config, "_checkpoints", None)
+    if recorder and (report.when == "call" or report.failed):
+        recorder.finish(item.nodeid, report.passed)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    records = step_hooks.records
+    for dimension, results in matrix_results.items():
+        from run_matrix import format_matrix, sensitivity, step_matrix
+        columns = list(dict.fromkeys(value for runs in results.values() for value in runs))
+        terminalreporter.section(f"{dimension} matrix")
+        for line in format_matrix(results, columns):
+            terminalreporter.write_line(line)
+        steps = step_matrix(records, matrix_runs, dimension)
+        if steps:
+            terminalreporter.write_line("")
+            for line in format_matrix(steps, columns):
+                terminalreporter.write_line(line)
+        if dimension == "cpu":
+            long_tasks = step_matrix(records, matrix_runs, dimension, field="long_tasks_ms")
+            terminalreporter.write_line("\nlong-task time per step")
+            for line in format_matrix(long_tasks, columns, unit="ms"):
+                terminalreporter.write_line(line)
+            rates = getattr(config, "_cpu_rates", {})
+            if len(columns) > 1:
+                baseline = min(columns, key=lambda c: rates.get(c, 1))
+                worst = max(columns, key=lambda c: rates.get(c, 1))
+                terminalreporter.write_line(f"\nmost CPU-sensitive steps ({baseline} -> {worst})")
+                for step, ratio in sensitivity(steps, baseline, worst)[:5]:
+                    terminalreporter.write_line(f"  {ratio:5.1f}x  {step}")
+    if account_tables:
+        terminalreporter.section("account verification")
+        for account, rows in sorted(account_tables.items()):
+            terminalreporter.write_line(f"{account}:")
+            for row in rows:
+                terminalreporter.write_line(f"  {'ok  ' if row['ok'] else 'FAIL'}  {row['field']:<14} "
+                                            f"expected {row['expected']!r}, got {row['actual']!r}",
+                                            red=not row["ok"])
+    if getattr(config, "_bench_report", None):
+        from bench_skills_scaling import format_report
+        terminalreporter.section(f"Assign Skills scaling ({config._bench_report['source']})")
+        for line, superlinear in format_report(config._bench_report):
+            terminalreporter.write_line(line, yellow=superlinear)
+    if not records:
+        return
+    terminalreporter.section("step timings")
+    for record in sorted(records, key=lambda r: r["duration"], reverse=True)[:10]:
+        terminalreporter.write_line(f"{record['duration']:8.3f}s  {record['step']}  ({record['test']})")
+    collector = getattr(config, "_resource_metrics", None)
+    for name, metrics in sorted(collector.suspects.items() if collector else []):
+        terminalreporter.write_line(f"monotonic growth in {name}: {', '.join(metrics)}", yellow=True)
+    if config.getoption("--fast-cdp") != "off":
+        import fast_cdp
+        terminalreporter.section(f"fast-cdp ({config.getoption('--fast-cdp')}), median latency per command")
+        for line in fast_cdp.report():
+            terminalreporter.write_line(line)
+    checker = getattr(config, "_budgets", None)
+    if checker and checker.violations:
+        from budgets import describe
+        terminalreporter.section("performance budgets")
+        for violation in checker.violations:
+            terminalreporter.write_line(f"[{violation['mode']}] {violation['step']}: {describe(violation)}  "
+                                        f"({violation['test']})", red=violation["mode"] == "fail",
+                                        yellow=violation["mode"] == "warn")
+    path = config.getoption("--step-timings")
+    if path:
+        with open(path, "w") as output:
+            json.dump(records, output, indent=2)
+
+
+def new_wait(config, driver, timeout=60):
+    if config.getoption("--no-dom-snapshots"):
+        return WebDriverWait(driver, timeout)
+    from dom_snapshot import DiagnosingWait
+    return DiagnosingWait(driver, timeout)
+
+
+# Applies the network profile a network_matrix test is parametrised with
+@pytest.fixture(autouse=True)
+def network_profile(request):
+    name = getattr(request, "param", None)
+    if name is None:
+        yield None
+        return
+    from network_profiles import apply_profile, reset
+    driver, _ = request.getfixturevalue("setup")
+    matrix_runs.setdefault(request.node.nodeid, {})["network"] = name
+    allure.dynamic.parameter("network", name)
+    apply_profile(driver, request.config._network_profiles[name])
+    yield name
+    reset(driver)
+
+
+# Applies the CPU slowdown a cpu_matrix test is parametrised with
+@pytest.fixture(autouse=True)
+def cpu_throttling(request):
+    name = getattr(request, "param", None)
+    if name is None:
+        yield None
+        return
+    from cpu_throttling import apply_rate, reset
+    driver, _ = request.getfixturevalue("setup")
+    matrix_runs.setdefault(request.node.nodeid, {})["cpu"] = name
+    allure.dynamic.parameter("cpu throttling", name)
+    apply_rate(driver, request.config._cpu_rates[name])
+    yield name
+    reset(driver)
+
+
+# Session-wide pool of warm browsers, or None when attaching to the shared Chrome
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    size = request.config.getoption("--browser-pool")
+    if not size:
+        yield None
+        return
+    from browser_pool import BrowserPool
+    pool = BrowserPool(
+        size=size,
+        max_tests=request.config.getoption("--pool-max-tests"),
+        max_heap_mb=request.config.getoption("--pool-max-heap-mb"),
+        max_rss_mb=request.config.getoption("--pool-max-rss-mb"),
+        chrome_binary=request.config.getoption("--chrome-binary"),
+        profile_template=request.config.getoption("--chrome-profile"),
+    )
+    yield pool
+    pool.close()
+
+
+# Fixture to attach to the shared Chrome instance once per module
+@pytest.fixture(scope="module")
+def attached_browser(request):
+    if request.config.getoption("--daemon"):
+        from driver_daemon import attach
+        driver = attach()
+        if driver is not None:
+            yield driver, new_wait(request.config, driver)
+            return
+        print("Driver daemon not running; attaching directly")
+    from webdriver_manager.chrome import ChromeDriverManager  # Only needed without the daemon
+
+    opt = Options()
+    opt.add_experimental_option("debuggerAddress", "localhost:9014")  # Connect to existing Chrome instance
+    # Add CI-friendly options
+    opt.add_argument("--no-sandbox")  # Required for CI environments
+    opt.add_argument("--disable-dev-shm-usage")  # Avoid shared memory issues in CI
+    opt.add_argument("--disable-gpu")  # Helps with headless stability
+    opt.add_argument("--window-size=1920,1080")  # Ensure proper rendering
+    opt.add_argument("--headless")  # Ensure headless mode for CI
+
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opt)
+    wait = new_wait(request.config, driver)  # Increased timeout to 60 seconds
+    yield driver, wait
+    driver.quit()
+
+
+# Fixture to set up and tear down the WebDriver; with --browser-pool each test
+# checks out a warm, health-checked browser and returns it afterwards
+@pytest.fixture
+def setup(request, browser_pool):
+    if browser_pool is None:
+        yield request.getfixturevalue("attached_browser")
+        return
+    browser = browser_pool.acquire()
+    yield browser.driver, new_wait(request.config, browser.driver)
+    browser_pool.release(browser)
+
+
+# Context manager factory for module-level setup and teardown that needs a browser
+@pytest.fixture(scope="module")
+def borrow_browser(request, browser_pool):
+    shared = None if browser_pool else request.getfixturevalue("attached_browser")
+
+    @contextlib.contextmanager
+    def borrow():
+        if shared is not None:
+            yield shared
+            return
+        browser = browser_pool.acquire()
+        try:
+            yield browser.driver, new_wait(request.config, browser.driver)
+        finally:
+            browser_pool.release(browser)
+
+    return borrow
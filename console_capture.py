@@ -0,0 +1,124 @@
+import collections
+import itertools
+import time
+
+import allure
+from allure_commons.types import AttachmentType
+
+from cdp_session import CdpSession
+from step_hooks import StepCheckFailed, add_step_parameter
+
+# Browser console messages and uncaught exceptions streamed over CDP Runtime events
+# into a bounded ring buffer. Each entry is tagged with the step that was active when
+# it arrived and attached to that step when it finishes.
+
+
+class JsErrorsThrown(StepCheckFailed):
+    pass
+
+
+def _remote_text(remote):
+    if "value" in remote:
+        return str(remote["value"])
+    return remote.get("description") or remote.get("unserializableValue") or remote.get("type", "")
+
+
+def _location(stack):
+    frames = (stack or {}).get("callFrames") or []
+    if not frames:
+        return ""
+    frame = frames[0]
+    return f"{frame.get('url') or '<anonymous>'}:{frame.get('lineNumber', 0) + 1}"
+
+
+def console_entry(params):
+    return {
+        "level": params.get("type", "log"),
+        "text": " ".join(_remote_text(arg) for arg in params.get("args", [])),
+        "location": _location(params.get("stackTrace")),
+    }
+
+
+def exception_entry(params):
+    details = params.get("exceptionDetails", {})
+    exception = details.get("exception") or {}
+    location = _location(details.get("stackTrace"))
+    if not location and details.get("url"):
+        location = f"{details['url']}:{details.get('lineNumber', 0) + 1}"
+    return {
+        "level": "exception",
+        "text": exception.get("description") or details.get("text", "Uncaught exception"),
+        "location": location,
+    }
+
+
+def format_entries(entries, dropped=0):
+    lines = [f"({dropped} older messages dropped from the ring buffer)"] if dropped else []
+    for entry in entries:
+        stamp = time.strftime("%H:%M:%S", time.localtime(entry["time"])) + f".{int(entry['time'] * 1000) % 1000:03d}"
+        location = f"  ({entry['location']})" if entry["location"] else ""
+        lines.append(f"[{stamp}] {entry['level']:<9} {entry['text']}{location}")
+    return "\n".join(lines)
+
+
+class ConsoleCapture:
+    # Step observer holding one CDP session per browser; --fail-on-js-errors makes
+    # an uncaught exception during a step fail that step
+    def __init__(self, buffer_size=1000, fail_on_errors=False):
+        self.entries = collections.deque(maxlen=buffer_size)
+        self.fail_on_errors = fail_on_errors
+        self.sessions = {}
+        self.active = {}  # session id -> stack of (step id, name, messages appended before it)
+        self.step_ids = itertools.count(1)
+        self.appended = 0
+
+    def _session(self, driver):
+        if driver.session_id not in self.sessions:
+            session = CdpSession.for_driver(driver)
+            session_id = driver.session_id
+            session.on("Runtime.consoleAPICalled", lambda params: self._add(session_id, console_entry(params)))
+            session.on("Runtime.exceptionThrown", lambda params: self._add(session_id, exception_entry(params)))
+            session.send("Runtime.enable")
+            self.sessions[session_id] = session
+        return self.sessions[driver.session_id]
+
+    def _add(self, session_id, entry):
+        stack = self.active.get(session_id)
+        entry.update(time=time.time(), session=session_id, step_id=stack[-1][0] if stack else None)
+        self.entries.append(entry)
+        self.appended += 1
+
+    def before_step(self, driver, name):
+        self._session(driver)
+        stack = self.active.setdefault(driver.session_id, [])
+        stack.append((next(self.step_ids), name, self.appended))
+
+    def after_step(self, driver, name, record, error):
+        stack = self.active.get(driver.session_id)
+        if not stack or stack[-1][1] != name:
+            return
+        step_id, _, appended_before = stack.pop()
+        # Messages logged since the previous step ended without any step open land here too
+        own = [entry for entry in list(self.entries) if entry["session"] == driver.session_id and
+               (entry["step_id"] == step_id or (entry["step_id"] is None and not entry.get("reported")))]
+        evicted_before = max(appended_before - self.entries.maxlen, 0)
+        dropped = max(self.appended - len(self.entries) - evicted_before, 0)
+        if not own:
+            return
+        for entry in own:
+            entry["reported"] = True
+        errors = [entry for entry in own if entry["level"] in ("exception", "error", "assert")]
+        exceptions = [entry for entry in own if entry["level"] == "exception"]
+        record["console"] = len(own)
+        record["js_errors"] = len(errors)
+        if errors:
+            add_step_parameter("js errors", len(errors))
+        allure.attach(format_entries(own, dropped), name=f"{name}_console", attachment_type=AttachmentType.TEXT)
+        if self.fail_on_errors and exceptions and error is None:
+            raise JsErrorsThrown(f"{len(exceptions)} uncaught JS error(s) during '{record['title']}': "
+                                 f"{exceptions[0]['text'].splitlines()[0]}")
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
@@ -0,0 +1,64 @@
+from step_hooks import add_step_parameter
+
+# Accumulates main-thread long tasks (>50 ms) on the page's own clock; installed for
+# every new document and into the current one
+LONG_TASK_OBSERVER = """
+if (!window.__dfperfLongTasks) {
+  window.__dfperfLongTasks = {count: 0, total: 0};
+  try {
+    new PerformanceObserver(list => {
+      for (const entry of list.getEntries()) {
+        window.__dfperfLongTasks.count += 1;
+        window.__dfperfLongTasks.total += entry.duration;
+      }
+    }).observe({type: 'longtask', buffered: true});
+  } catch (e) {}
+}
+"""
+READ_LONG_TASKS = """
+const tasks = window.__dfperfLongTasks || {count: 0, total: 0};
+return {count: tasks.count, total: tasks.total, origin: performance.timeOrigin};
+"""
+
+
+def parse_rates(spec):
+    rates = [float(rate) for rate in spec.split(",") if rate.strip()]
+    if any(rate < 1 for rate in rates):
+        raise ValueError("CPU throttling rates are slowdown factors and must be >= 1")
+    return {f"cpu{rate:g}x": rate for rate in rates}
+
+
+def apply_rate(driver, rate):
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": rate})
+
+
+def reset(driver):
+    apply_rate(driver, 1)
+
+
+class LongTaskCollector:
+    # Step observer recording long-task count and total duration per step
+    def __init__(self):
+        self.installed = set()
+        self.before = {}
+
+    def _install(self, driver):
+        if driver.session_id not in self.installed:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LONG_TASK_OBSERVER})
+            self.installed.add(driver.session_id)
+        driver.execute_script(LONG_TASK_OBSERVER)
+
+    def before_step(self, driver, name):
+        self._install(driver)
+        self.before[(driver.session_id, name)] = driver.execute_script(READ_LONG_TASKS)
+
+    def after_step(self, driver, name, record, error):
+        before = self.before.pop((driver.session_id, name), None)
+        if before is None:
+            return
+        after = driver.execute_script(READ_LONG_TASKS)
+        if after["origin"] != before["origin"]:
+            before = {"count": 0, "total": 0}  # The step loaded a new document
+        record["long_tasks"] = after["count"] - before["count"]
+        record["long_tasks_ms"] = round(after["total"] - before["total"], 1)
+        add_step_parameter("long tasks", f"{record['long_tasks']} ({record['long_tasks_ms']} ms)")
@@ -0,0 +1,148 @@
+import json
+import os
+import uuid
+
+from selenium.webdriver.common.by import By
+
+# Marker typed into every entity this run creates, so cleanup can find exactly them
+RUN_TAG = f"[dfperf {uuid.uuid4().hex[:8]}]"
+# Text shared by all skills the suite has ever created, tagged or not
+AUTOMATION_MARKER = "Manual input description."
+
+_FETCH_SCRIPT = """
+const [method, url, body, token, done] = arguments;
+const headers = {'Content-Type': 'application/json'};
+if (token) headers['Authorization'] = 'Bearer ' + token;
+fetch(url, {method: method, credentials: 'include', headers: headers, body: body})
+  .then(r => r.text().then(t => done({status: r.status, body: t})))
+  .catch(e => done({status: 0, body: String(e)}));
+"""
+
+
+class CreatedEntities:
+    # Everything the current run has created, grouped by entity kind
+    def __init__(self):
+        self.items = {}
+
+    def track(self, kind, **attributes):
+        self.items.setdefault(kind, []).append(attributes)
+
+    def count(self, kind):
+        return len(self.items.get(kind, []))
+
+    def clear(self, kind):
+        self.items.pop(kind, None)
+
+
+created_entities = CreatedEntities()
+
+
+class SkillsApi:
+    # Calls the app's skills API from inside the signed-in page so the browser's
+    # own session cookies apply; DFPERF_API_TOKEN adds a bearer token if needed
+    def __init__(self, driver, base_url, path="/api/skills"):
+        self.driver = driver
+        self.url = base_url.rstrip("/") + path
+        self.token = os.environ.get("DFPERF_API_TOKEN")
+
+    def _call(self, method, url, body=None):
+        self.driver.set_script_timeout(60)
+        response = self.driver.execute_async_script(
+            _FETCH_SCRIPT, method, url, None if body is None else json.dumps(body), self.token)
+        if not 200 <= response["status"] < 300:
+            raise RuntimeError(f"{method} {url} returned {response['status']}: {response['body'][:200]}")
+        return json.loads(response["body"]) if response["body"] else None
+
+    def list(self):
+        return self._call("GET", self.url)
+
+    def create(self, skill):
+        return self._call("POST", self.url, skill)
+
+    def delete(self, skill_id):
+        self._call("DELETE", f"{self.url}/{skill_id}")
+
+
+def load_skill_template(path):
+    # The skills API is not documented anywhere in this repo, so the body of a new skill
+    # is never guessed: it comes from a JSON file (--skills-payload) taken from the app's
+    # own request, with "{description}" wherever the tagged description belongs, e.g.
+    #   {"categoryId": 3, "skillId": 41, "experience": 1, "version": "1", "description": "{description}"}
+    with open(path) as source:
+        template = json.load(source)
+    if not isinstance(template, dict) or "{description}" not in template.values():
+        raise ValueError(f"{path} must be a JSON object with a \"{{description}}\" value")
+    return template
+
+
+def skill_payload(index, template, tag=RUN_TAG):
+    # Body for seeding a skill through the API; the description carries the marker and tag
+    description = f"{AUTOMATION_MARKER} {tag} #{index}"
+    return {key: description if value == "{description}" else value for key, value in template.items()}
+
+
+def _description(skill):
+    return skill.get("description") or skill.get("Description") or ""
+
+
+def _skill_id(skill):
+    return skill.get("id", skill.get("Id"))
+
+
+def delete_tagged_skills_via_ui(driver, wait, tag):
+    # Fallback when the API is unavailable: remove matching rows on the assign-skills page
+    removed = 0
+    remove_xpath = f"//nb-list-item[contains(., '{tag}')]/div/span[3]/span"
+    while True:
+        buttons = driver.find_elements(By.XPATH, remove_xpath)
+        if not buttons:
+            return removed
+        buttons[0].click()
+        wait.until(lambda d: len(d.find_elements(By.XPATH, remove_xpath)) < len(buttons))
+        removed += 1
+
+
+def cleanup_created_skills(api, driver, wait, tag=RUN_TAG):
+    if not created_entities.count("skill"):
+        return 0
+    try:
+        tagged = [s for s in api.list() if tag in _description(s)]
+        for skill in tagged:
+            api.delete(_skill_id(skill))
+        removed = len(tagged)
+    except Exception as e:
+        print(f"Skills API cleanup failed ({e}); falling back to the UI")
+        removed = delete_tagged_skills_via_ui(driver, wait, tag)
+    created_entities.clear("skill")
+    return removed
+
+
+BASELINE_TAG = "[dfperf baseline]"
+
+
+def reset_skills(api, baseline, template=None):
+    # Bring the account back to `baseline` skills: surplus automation-created ones are
+    # deleted oldest first (skills entered by people are never touched), a shortfall is
+    # seeded over the API from `template`. Seeded skills carry BASELINE_TAG rather than
+    # RUN_TAG so the end-of-run cleanup keeps them for the next run.
+    skills = api.list()
+    surplus = len(skills) - baseline
+    automation = [s for s in skills if AUTOMATION_MARKER in _description(s)]
+    for skill in automation[:max(surplus, 0)]:
+        api.delete(_skill_id(skill))
+    remaining = len(skills) - min(max(surplus, 0), len(automation))
+    if remaining < baseline:
+        if template is None:
+            raise RuntimeError(f"Skills dataset has {remaining} entries, below the baseline of {baseline}; "
+                               f"pass --skills-payload with a request body for the skills API to seed the rest")
+        for index in range(remaining, baseline):
+            api.create(skill_payload(index + 1, template, tag=BASELINE_TAG))
+        skills = api.list()
+        seeded = [s for s in skills if BASELINE_TAG in _description(s)]
+        remaining = len(skills)
+        if not seeded or remaining != baseline:
+            raise RuntimeError(f"Seeding skills from --skills-payload left {remaining} entries "
+                               f"({len(seeded)} tagged {BASELINE_TAG}), expected {baseline}; check the payload")
+    elif remaining != baseline:
+        print(f"Skills dataset has {remaining} entries, expected {baseline}")
+    return remaining
@@ -0,0 +1,384 @@
+import argparse
+import gzip
+import json
+import re
+
+import allure
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# DOMSnapshot.captureSnapshot as a failure artefact: gzip'd compact JSON of the
+# string-table snapshot, plus an offline diagnosis of the locator that missed.
+#   python dom_snapshot.py snapshot.json.gz "//p[span[contains(text(),'Name:')]]"
+
+COMPUTED_STYLES = ["display", "visibility", "opacity"]
+ELEMENT_NODE, TEXT_NODE = 1, 3
+
+last_locators = {}  # session_id -> last locator passed to a DiagnosingWait or fast_cdp
+
+
+def capture(driver):
+    return driver.execute_cdp_cmd("DOMSnapshot.captureSnapshot",
+                                  {"computedStyles": COMPUTED_STYLES, "includeDOMRects": True})
+
+
+def compress(snapshot):
+    return gzip.compress(json.dumps(snapshot, separators=(",", ":")).encode(), compresslevel=9)
+
+
+def load(path):
+    with gzip.open(path) as compressed:
+        return json.load(compressed)
+
+
+class Node:
+    def __init__(self, index, node_type, name, value, attrs):
+        self.index = index
+        self.type = node_type
+        self.tag = name.lower()
+        self.value = value
+        self.attrs = attrs
+        self.parent = None
+        self.children = []
+        self.bounds = None
+        self.styles = {}
+
+    @property
+    def elements(self):
+        return [c for c in self.children if c.type == ELEMENT_NODE]
+
+    def own_text(self):
+        return "".join(c.value for c in self.children if c.type == TEXT_NODE)
+
+    def text(self):
+        if self.type == TEXT_NODE:
+            return self.value
+        return "".join(c.text() for c in self.children)
+
+    def descendants_or_self(self):
+        yield self
+        for child in self.children:
+            yield from child.descendants_or_self()
+
+    def describe(self):
+        attrs = "".join(f"[@{k}='{v}']" for k, v in self.attrs.items() if k in ("id", "class"))
+        return f"{self.tag}{attrs}"
+
+
+def build_tree(snapshot, document=0):
+    strings = snapshot["strings"]
+    doc = snapshot["documents"][document]
+    raw = doc["nodes"]
+
+    def string(index):
+        return strings[index] if index is not None and index >= 0 else ""
+
+    nodes = []
+    for i, parent in enumerate(raw["parentIndex"]):
+        pairs = raw["attributes"][i] if i < len(raw.get("attributes", [])) else []
+        attrs = {string(pairs[j]): string(pairs[j + 1]) for j in range(0, len(pairs) - 1, 2)}
+        nodes.append(Node(i, raw["nodeType"][i], string(raw["nodeName"][i]), string(raw["nodeValue"][i]), attrs))
+        if parent >= 0:
+            nodes[i].parent = nodes[parent]
+            nodes[parent].children.append(nodes[i])
+    layout = doc.get("layout", {})
+    for position, node_index in enumerate(layout.get("nodeIndex", [])):
+        nodes[node_index].bounds = layout["bounds"][position]
+        styles = layout["styles"][position] if position < len(layout.get("styles", [])) else []
+        nodes[node_index].styles = {name: string(idx) for name, idx in zip(COMPUTED_STYLES, styles)}
+    return nodes[0]
+
+
+# --- XPath subset: / and // steps, name tests, positions, @attr, contains(), text(), nested paths
+
+def _split_top(expr, separator):
+    parts, depth, quote, current = [], 0, None, ""
+    i = 0
+    while i < len(expr):
+        ch = expr[i]
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "[(":
+            depth += 1
+        elif ch in "])":
+            depth -= 1
+        elif depth == 0 and expr.startswith(separator, i):
+            parts.append(current)
+            current = ""
+            i += len(separator)
+            continue
+        current += ch
+        i += 1
+    parts.append(current)
+    return parts
+
+
+def _split_predicates(part):
+    bracket = part.find("[")
+    if bracket < 0:
+        return part.strip(), []
+    predicates, depth, quote, current = [], 0, None, ""
+    for ch in part[bracket:]:
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "[":
+            depth += 1
+            if depth == 1:
+                continue
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                predicates.append(current)
+                current = ""
+                continue
+        current += ch
+    return part[:bracket].strip(), predicates
+
+
+def parse_xpath(xpath):
+    parts = _split_top(xpath.strip(), "/")
+    absolute = parts[0] == "" and len(parts) > 1
+    steps, axis = [], "child"
+    for part in parts[1:] if absolute else parts:
+        if part == "":
+            axis = "descendant"
+            continue
+        name, predicates = _split_predicates(part)
+        steps.append((axis, name, predicates, part))
+        axis = "child"
+    return absolute, steps
+
+
+def _predicate(node, position, size, expr):
+    expr = expr.strip()
+    conditions = _split_top(expr, " and ")
+    if len(conditions) > 1:
+        return all(_predicate(node, position, size, c) for c in conditions)
+    if expr.isdigit():
+        return position == int(expr)
+    if expr == "last()":
+        return position == size
+    match = re.fullmatch(r"@([\w:-]+)\s*=\s*(['\"])(.*)\2", expr)
+    if match:
+        return node.attrs.get(match.group(1)) == match.group(3)
+    match = re.fullmatch(r"@([\w:-]+)", expr)
+    if match:
+        return match.group(1) in node.attrs
+    match = re.fullmatch(r"contains\(\s*(@[\w:-]+|text\(\)|\.)\s*,\s*(['\"])(.*)\2\s*\)", expr)
+    if match:
+        subject = match.group(1)
+        haystack = (node.attrs.get(subject[1:], "") if subject.startswith("@")
+                    else node.own_text() if subject == "text()" else node.text())
+        return match.group(3) in haystack
+    match = re.fullmatch(r"(text\(\)|\.)\s*=\s*(['\"])(.*)\2", expr)
+    if match:
+        return (node.own_text() if match.group(1) == "text()" else node.text()).strip() == match.group(3)
+    return bool(evaluate_xpath(expr, [node]))
+
+
+def _apply_step(context, axis, name, predicates):
+    matched = []
+    seen = set()
+    for ctx in context:
+        parents = list(ctx.descendants_or_self()) if axis == "descendant" else [ctx]
+        for parent in parents:
+            if name == ".":
+                candidates = [parent]
+            else:
+                candidates = [c for c in parent.elements if name == "*" or c.tag == name.lower()]
+            for predicate in predicates:
+                candidates = [c for i, c in enumerate(candidates, 1) if _predicate(c, i, len(candidates), predicate)]
+            for candidate in candidates:
+                if candidate.index not in seen:
+                    seen.add(candidate.index)
+                    matched.append(candidate)
+    return sorted(matched, key=lambda n: n.index)
+
+
+def evaluate_xpath(xpath, context, trace=None):
+    absolute, steps = parse_xpath(xpath)
+    if absolute:
+        root = context[0]
+        while root.parent is not None:
+            root = root.parent
+        context = [root]
+    for axis, name, predicates, text in steps:
+        context = _apply_step(context, axis, name, predicates)
+        if trace is not None:
+            trace.append((("//" if axis == "descendant" else "/") + text, context))
+        if not context:
+            break
+    return context
+
+
+# --- CSS subset: tag, #id, .class, [attr=value], :nth-child(n), descendant and > combinators
+
+def _css_compound_matches(node, compound):
+    if node.type != ELEMENT_NODE:
+        return False
+    for token in re.findall(r"[#.]?[\w-]+|\[[^\]]+\]|:[\w-]+\([^)]*\)|\*", compound):
+        if token == "*":
+            continue
+        if token.startswith("#"):
+            ok = node.attrs.get("id") == token[1:]
+        elif token.startswith("."):
+            ok = token[1:] in node.attrs.get("class", "").split()
+        elif token.startswith("["):
+            name, _, value = token[1:-1].partition("=")
+            ok = node.attrs.get(name) == value.strip("'\"") if value else name in node.attrs
+        elif token.startswith(":nth-child("):
+            siblings = node.parent.elements if node.parent else [node]
+            ok = siblings.index(node) + 1 == int(token[len(":nth-child("):-1])
+        else:
+            ok = node.tag == token.lower()
+        if not ok:
+            return False
+    return True
+
+
+def evaluate_css(selector, root, trace=None):
+    tokens = re.sub(r"\s*>\s*", " > ", selector.strip()).split()
+    context, combinator, first = [root], " ", True
+    for token in tokens:
+        if token == ">":
+            combinator = ">"
+            continue
+        matched = []
+        for ctx in context:
+            pool = ctx.elements if combinator == ">" else [n for n in ctx.descendants_or_self() if n is not ctx or first]
+            matched.extend(n for n in pool if _css_compound_matches(n, token))
+        context = sorted({n.index: n for n in matched}.values(), key=lambda n: n.index)
+        if trace is not None:
+            trace.append(((combinator + " " if not first else "") + token, context))
+        combinator, first = " ", False
+        if not context:
+            break
+    return context
+
+
+def _as_xpath_or_css(by, value):
+    if by == "xpath":
+        return "xpath", value
+    if by == "css selector":
+        return "css", value
+    if by == "id":
+        return "css", f"#{value}"
+    if by == "class name":
+        return "css", f".{value}"
+    if by == "tag name":
+        return "css", value
+    if by == "name":
+        return "css", f"[name={value}]"
+    raise ValueError(f"Unsupported locator strategy '{by}'")
+
+
+def _visibility(node):
+    if node.bounds is None:
+        return "not rendered (no layout box: display:none or detached)"
+    x, y, width, height = node.bounds
+    problems = [f"{k}: {v}" for k, v in node.styles.items()
+                if (k, v) in (("display", "none"), ("visibility", "hidden"), ("opacity", "0"))]
+    if width == 0 or height == 0:
+        problems.append("zero size")
+    where = f"at ({x:.0f},{y:.0f}) size {width:.0f}x{height:.0f}"
+    return f"{where}; " + (", ".join(problems) if problems else "visible")
+
+
+def diagnose(snapshot, by, value):
+    # Replays the locator step by step against the snapshot and explains where it stops matching
+    root = build_tree(snapshot)
+    url = snapshot["documents"][0].get("documentURL", -1)  # An index into the string table
+    lines = [f"Locator: ({by}, {value!r})", f"Document: {snapshot['strings'][url] if url >= 0 else ''}"]
+    try:
+        kind, selector = _as_xpath_or_css(by, value)
+        trace = []
+        matches = (evaluate_xpath(selector, [root], trace) if kind == "xpath"
+                   else evaluate_css(selector, root, trace))
+    except (ValueError, IndexError, re.error) as e:
+        return "\n".join(lines + [f"Could not evaluate offline: {e}"])
+    previous = [root]
+    for step, matched in trace:
+        lines.append(f"  {len(matched):4d} match(es) after {step}")
+        if not matched:
+            children = {}
+            for node in previous:
+                for child in node.elements:
+                    children[child.describe()] = children.get(child.describe(), 0) + 1
+            lines.append("  No match. Children available at the last matching level:")
+            lines.extend(f"    {count} x {name}" for name, count in sorted(children.items())[:25])
+            break
+        previous = matched
+    for node in matches[:5]:
+        lines.append(f"  Match {node.describe()}: {_visibility(node)}; text {node.text().strip()[:80]!r}")
+    return "\n".join(lines)
+
+
+def attach_snapshot(driver, name="dom_snapshot", locator=None):
+    snapshot = capture(driver)
+    body = compress(snapshot)
+    allure.attach(body, name=f"{name}.json.gz", attachment_type="application/gzip", extension="json.gz")
+    report = f"Snapshot: {len(body) / 1024:.1f} KB compressed\n"
+    if locator is not None:
+        report += diagnose(snapshot, *locator)
+    allure.attach(report, name=f"{name}_diagnosis", attachment_type=allure.attachment_type.TEXT)
+    return report
+
+
+def _locator_of(condition):
+    # expected_conditions helpers close over their (By, value) locator tuple
+    for cell in getattr(condition, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, tuple) and len(value) == 2 and all(isinstance(v, str) for v in value):
+            return value
+    return None
+
+
+class DiagnosingWait(WebDriverWait):
+    # WebDriverWait that attaches a DOM snapshot and locator diagnosis on timeout
+    def until(self, method, message=""):
+        locator = _locator_of(method)
+        if locator is not None:
+            last_locators[self._driver.session_id] = locator
+        try:
+            return super().until(method, message)
+        except TimeoutException as e:
+            try:
+                report = attach_snapshot(self._driver, "timeout_dom_snapshot", locator)
+                e.msg = f"{e.msg or ''}\n{report}".strip()
+                e._dom_snapshot_attached = True
+            except Exception as capture_error:
+                print(f"DOM snapshot capture failed: {capture_error}")
+            raise
+
+
+class DomSnapshotOnFailure:
+    # Step observer: on a failure the wait did not already capture (e.g. an assertion
+    # in verify_profile_detail), snapshot the DOM and diagnose the last locator used
+    def after_step(self, driver, name, record, error):
+        if error is None or getattr(error, "_dom_snapshot_attached", False):
+            return
+        attach_snapshot(driver, f"{name}_dom_snapshot", last_locators.get(driver.session_id))
+        try:
+            error._dom_snapshot_attached = True
+        except AttributeError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnose a locator against a saved DOM snapshot")
+    parser.add_argument("snapshot", help="Path to a .json.gz snapshot attachment")
+    parser.add_argument("selector")
+    parser.add_argument("--by", default="xpath", help="xpath, css selector, id, class name, tag name or name")
+    args = parser.parse_args()
+    print(diagnose(load(args.snapshot), args.by, args.selector))
+
+
+if __name__ == "__main__":
+    main()
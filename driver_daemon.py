@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+
+# Keeps chromedriver and a signed-in Chrome warm between pytest invocations.
+#   python driver_daemon.py start [--sign-in]   (leave running in its own terminal)
+#   python driver_daemon.py status | stop
+#   pytest test_script.py -k test_verify_profile_email --daemon
+
+STATE_FILE = os.environ.get("DFPERF_DAEMON_STATE",
+                            os.path.join(tempfile.gettempdir(), "dfperf-driver-daemon.json"))
+DEFAULT_PROFILE = os.path.join(os.path.expanduser("~"), ".dfperf-chrome-profile")
+KEEPALIVE_SECONDS = 30
+
+
+class DaemonDriver(webdriver.Remote):
+    # Re-uses the daemon's WebDriver session instead of creating one, so attaching
+    # costs a single keep-alive HTTP connection
+    def __init__(self, executor_url, session_id, capabilities):
+        self._daemon_session = (session_id, capabilities)
+        super().__init__(command_executor=ChromeRemoteConnection(executor_url, keep_alive=True),
+                         options=Options())
+
+    def start_session(self, capabilities):
+        self.session_id, self.caps = self._daemon_session
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self):
+        pass  # The session belongs to the daemon
+
+
+def read_state():
+    try:
+        with open(STATE_FILE) as state:
+            return json.load(state)
+    except (OSError, ValueError):
+        return None
+
+
+def daemon_alive(state):
+    try:
+        os.kill(state["pid"], 0)
+        with urllib.request.urlopen(state["executor_url"] + "/status", timeout=1):
+            return True
+    except (OSError, KeyError):
+        return False
+
+
+def attach():
+    # Client side: returns a driver on the warm session, or None if no daemon is up
+    state = read_state()
+    if not state or not daemon_alive(state):
+        return None
+    driver = DaemonDriver(state["executor_url"], state["session_id"], state["capabilities"])
+    try:
+        driver.execute_script("return 1")
+    except Exception:
+        return None
+    return driver
+
+
+def serve(args):
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    from browser_pool import debugger_ready, launch_chrome
+
+    chrome = None
+    if not debugger_ready(args.port):
+        os.makedirs(args.profile, exist_ok=True)
+        chrome = launch_chrome(args.chrome_binary, args.port, args.profile)
+    opt = Options()
+    opt.add_experimental_option("debuggerAddress", f"localhost:{args.port}")
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=opt)
+
+    if args.sign_in:
+        from test_script import app_states
+        app_states.navigate_to(driver, WebDriverWait(driver, 60), "dashboard", fresh=False)
+
+    with open(STATE_FILE, "w") as state:
+        json.dump({"pid": os.getpid(), "executor_url": service.service_url, "session_id": driver.session_id,
+                   "capabilities": driver.caps, "debugger_address": f"localhost:{args.port}"}, state)
+
+    def shutdown(*_):
+        if os.path.exists(STATE_FILE):
+            os.remove(STATE_FILE)
+        driver.quit()
+        if chrome is not None:
+            chrome.terminate()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    print(f"Driver daemon ready: {service.service_url} session {driver.session_id}")
+    while True:
+        time.sleep(KEEPALIVE_SECONDS)
+        try:
+            driver.execute_script("return 1")
+        except Exception as e:
+            print(f"Driver daemon: session lost ({e}), shutting down")
+            shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm chromedriver + Chrome daemon for fast test startup")
+    parser.add_argument("command", choices=("start", "stop", "status"))
+    parser.add_argument("--port", type=int, default=9014, help="Chrome remote debugging port")
+    parser.add_argument("--chrome-binary", default="google-chrome-stable")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="Persistent user-data-dir for the signed-in session")
+    parser.add_argument("--sign-in", action="store_true", help="Open the site and sign in before going idle")
+    args = parser.parse_args()
+
+    state = read_state()
+    if args.command == "start":
+        if state and daemon_alive(state):
+            print(f"Driver daemon already running (pid {state['pid']})")
+            return
+        serve(args)
+    elif args.command == "stop":
+        if not state:
+            print("Driver daemon not running")
+            return
+        try:
+            os.kill(state["pid"], signal.SIGTERM)
+        except ProcessLookupError:
+            # Killed without running its shutdown handler; drop the stale state
+            print(f"Driver daemon not running (stale pid {state['pid']})")
+            os.remove(STATE_FILE)
+    else:
+        alive = bool(state) and daemon_alive(state)
+        print(json.dumps(dict(state, alive=alive), indent=2) if state else "Driver daemon not running")
+
+
+if __name__ == "__main__":
+    main()
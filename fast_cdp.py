@@ -0,0 +1,354 @@
+import asyncio
+import base64
+import concurrent.futures
+import itertools
+import json
+import statistics
+import threading
+import time
+
+from selenium.common.exceptions import ElementClickInterceptedException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from cdp_session import CdpError, page_websocket_url
+from dom_snapshot import last_locators
+
+try:
+    import websockets
+except ImportError:  # pip install websockets to enable --fast-cdp
+    websockets = None
+
+# Hot helper operations (wait-for-element, click, typing, text, screenshots) sent
+# straight to the page's DevTools websocket from an asyncio client instead of
+# Python -> HTTP -> chromedriver -> CDP. Waiting happens inside the page in a single
+# round trip. Locators or failures it cannot handle fall back to Selenium, except
+# once a click or keystrokes have been dispatched, which are never sent twice.
+#   off      Selenium only (default)
+#   on       CDP, with every SHADOW_EVERY-th read-only call also timed through Selenium
+#   compare  alternate CDP and Selenium call by call to measure both paths on one run
+mode = "off"
+SHADOW_EVERY = 10
+POLL_MS = 50
+
+latencies = {}  # command -> {"cdp": [seconds], "selenium": [seconds]}
+fallbacks = {}  # command -> count
+pages = {}  # session id -> FastPage
+calls = {}  # command -> call counter
+_loop = None
+_loop_lock = threading.Lock()
+
+FINDERS = {
+    By.XPATH: "document.evaluate({0}, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue",
+    By.CSS_SELECTOR: "document.querySelector({0})",
+    By.ID: "document.getElementById({0})",
+    By.CLASS_NAME: "document.getElementsByClassName({0})[0]",
+    By.TAG_NAME: "document.getElementsByTagName({0})[0]",
+}
+# Resolves to {value: ...} once the element is ready (and the action ran), or null on timeout
+WAIT_FOR = """
+new Promise(resolve => {
+  const deadline = Date.now() + %(timeout)d;
+  const visible = el => {
+    const style = getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && parseFloat(style.opacity) > 0
+      && el.getClientRects().length > 0;
+  };
+  const tick = () => {
+    const el = %(finder)s;
+    if (el && visible(el) && (!%(clickable)s || !el.disabled)) return resolve({value: %(action)s});
+    if (Date.now() > deadline) return resolve(null);
+    setTimeout(tick, %(poll)d);
+  };
+  tick();
+})
+"""
+ACTIONS = {
+    "wait": "true",
+    # `hit` is the element that would receive the click instead, as Selenium reports it
+    "point": "(el.scrollIntoView({block: 'center', inline: 'center'}), "
+             "(r => (p => (hit => ({x: p.x, y: p.y, hit: !hit || hit === el || el.contains(hit) ? null "
+             ": hit.cloneNode(false).outerHTML}))(document.elementFromPoint(p.x, p.y)))"
+             "({x: r.left + r.width / 2, y: r.top + r.height / 2}))(el.getBoundingClientRect()))",
+    "focus": "(el.focus(), el.select ? el.select() : document.execCommand('selectAll'), true)",
+    "text": "el.innerText",
+}
+
+
+class AsyncCdpClient:
+    def __init__(self, ws):
+        self.ws = ws
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.reader = asyncio.get_running_loop().create_task(self._read())
+
+    @classmethod
+    async def connect(cls, ws_url):
+        # No Origin header, so Chrome needs no --remote-allow-origins; screenshots exceed the 1 MB default
+        return cls(await websockets.connect(ws_url, max_size=None, ping_interval=None))
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                future = self.pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("CDP connection closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None):
+        if self.reader.done():
+            raise CdpError("CDP connection closed")
+        command_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[command_id] = future
+        await self.ws.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        message = await future
+        if "error" in message:
+            raise CdpError(f"{method}: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    async def send_all(self, commands):
+        # Pipelined: every command is on the wire before the first response arrives
+        return await asyncio.gather(*(self.send(method, params) for method, params in commands))
+
+    async def close(self):
+        await self.ws.close()
+
+
+# Anything that means the direct connection is unusable rather than the page being wrong
+FALLBACK_ERRORS = (CdpError, OSError, concurrent.futures.TimeoutError) + (
+    (websockets.WebSocketException,) if websockets is not None else ())
+
+
+def _run(coroutine, timeout):
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="fast-cdp", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coroutine, _loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()  # Otherwise it keeps running on the loop and may still act on the page
+        raise
+
+
+class FastPage:
+    def __init__(self, driver):
+        self.client = _run(AsyncCdpClient.connect(page_websocket_url(driver)), 10)
+        self.dispatched = False  # Input events sent for the current command
+
+    def send(self, method, params=None, timeout=60):
+        return _run(self.client.send(method, params), timeout)
+
+    def send_all(self, commands, timeout=60):
+        return _run(self.client.send_all(commands), timeout)
+
+    def wait_for(self, locator, timeout, clickable=False, action="wait"):
+        by, value = locator
+        deadline = time.monotonic() + timeout
+        while True:
+            expression = WAIT_FOR % {
+                "timeout": max(deadline - time.monotonic(), 0) * 1000, "poll": POLL_MS,
+                "clickable": "true" if clickable else "false",
+                "finder": FINDERS[by].format(json.dumps(value)), "action": ACTIONS[action],
+            }
+            try:
+                result = self.send("Runtime.evaluate", {"expression": expression, "awaitPromise": True,
+                                                        "returnByValue": True}, timeout + 10)
+            except CdpError as e:
+                # A navigation destroys the context the promise was running in; start again on the new page
+                if "context" in str(e).lower() and time.monotonic() < deadline:
+                    continue
+                raise
+            if "exceptionDetails" in result:
+                details = result["exceptionDetails"]
+                raise CdpError((details.get("exception") or {}).get("description") or details.get("text"))
+            value = result["result"].get("value")
+            return value["value"] if value else None
+
+    def click_at(self, point):
+        base = {"x": point["x"], "y": point["y"], "button": "left", "clickCount": 1}
+        self.dispatched = True
+        self.send_all([
+            ("Input.dispatchMouseEvent", dict(base, type="mouseMoved", button="none")),
+            ("Input.dispatchMouseEvent", dict(base, type="mousePressed")),
+            ("Input.dispatchMouseEvent", dict(base, type="mouseReleased")),
+        ])
+
+    def insert_text(self, text):
+        # Replaces the selection made by the "focus" action and fires an input event
+        self.dispatched = True
+        if text:
+            self.send("Input.insertText", {"text": text})
+        else:
+            self.send("Input.dispatchKeyEvent", {"type": "keyDown", "key": "Delete", "code": "Delete",
+                                                 "windowsVirtualKeyCode": 46})
+
+    def screenshot(self):
+        return base64.b64decode(self.send("Page.captureScreenshot", {"format": "png"})["data"])
+
+    def close(self):
+        _run(self.client.close(), 5)
+
+
+def _page(driver):
+    if driver.session_id not in pages:
+        pages[driver.session_id] = FastPage(driver)
+    return pages[driver.session_id]
+
+
+def _record(command, path, seconds):
+    latencies.setdefault(command, {"cdp": [], "selenium": []})[path].append(seconds)
+
+
+def _use_cdp(command, locator=None):
+    if mode == "off" or websockets is None or (locator is not None and locator[0] not in FINDERS):
+        return False
+    if mode == "compare":
+        return next(calls.setdefault(command, itertools.count())) % 2 == 0
+    return True
+
+
+def _shadow(command):
+    return mode == "on" and next(calls.setdefault(f"{command}:shadow", itertools.count())) % SHADOW_EVERY == 0
+
+
+def _timeout(wait):
+    return getattr(wait, "_timeout", 60)
+
+
+def _run_command(command, driver, wait, locator, fast, slow, read_only=False):
+    # fast(page, timeout) returns a result, or raises LookupError when the element never
+    # became ready; slow(wait) is the Selenium equivalent
+    if locator is not None:
+        last_locators[driver.session_id] = locator  # So a failure snapshot can still diagnose it
+    if _use_cdp(command, locator):
+        start = time.perf_counter()
+        page = None
+        try:
+            page = _page(driver)
+            page.dispatched = False
+            result = fast(page, _timeout(wait))
+        except LookupError:
+            # Let a short Selenium wait raise the TimeoutException (and attach its diagnosis)
+            return slow(type(wait)(driver, 1))
+        except FALLBACK_ERRORS as e:
+            pages.pop(driver.session_id, None)
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+            if page is not None and page.dispatched:
+                # The click or keystrokes may already have reached the page; repeating
+                # them through Selenium could submit twice
+                raise CdpError(f"fast-cdp {command} failed after dispatching input: {e}") from e
+            fallbacks[command] = fallbacks.get(command, 0) + 1
+            print(f"fast-cdp {command} fell back to Selenium: {e}")
+        else:
+            _record(command, "cdp", time.perf_counter() - start)
+            if read_only and _shadow(command):
+                start = time.perf_counter()
+                slow(wait)
+                _record(command, "selenium", time.perf_counter() - start)
+            return result
+    start = time.perf_counter()
+    result = slow(wait)
+    _record(command, "selenium", time.perf_counter() - start)
+    return result
+
+
+def _ready(page, locator, timeout, clickable=False, action="wait"):
+    result = page.wait_for(locator, timeout, clickable, action)
+    if result is None:
+        raise LookupError(locator)
+    return result
+
+
+def click(driver, wait, locator):
+    def fast(page, timeout):
+        point = _ready(page, locator, timeout, clickable=True, action="point")
+        if point["hit"]:
+            raise ElementClickInterceptedException(
+                f"element click intercepted: Element {locator} is not clickable at point "
+                f"({point['x']:.0f}, {point['y']:.0f}). Other element would receive the click: {point['hit']}")
+        page.click_at(point)
+
+    def slow(selenium_wait):
+        selenium_wait.until(EC.element_to_be_clickable(locator)).click()
+
+    _run_command("click", driver, wait, locator, fast, slow)
+
+
+def fill(driver, wait, locator, text):
+    # clear() then send_keys(text)
+    def fast(page, timeout):
+        _ready(page, locator, timeout, action="focus")
+        page.insert_text(text)
+
+    def slow(selenium_wait):
+        element = selenium_wait.until(EC.visibility_of_element_located(locator))
+        element.clear()
+        element.send_keys(text)
+
+    _run_command("fill", driver, wait, locator, fast, slow)
+
+
+def text(driver, wait, locator):
+    def fast(page, timeout):
+        return _ready(page, locator, timeout, action="text")
+
+    def slow(selenium_wait):
+        return selenium_wait.until(EC.visibility_of_element_located(locator)).text
+
+    return _run_command("text", driver, wait, locator, fast, slow, read_only=True)
+
+
+def wait_visible(driver, wait, locator):
+    def fast(page, timeout):
+        _ready(page, locator, timeout)
+
+    def slow(selenium_wait):
+        selenium_wait.until(EC.visibility_of_element_located(locator))
+
+    _run_command("query", driver, wait, locator, fast, slow, read_only=True)
+
+
+def screenshot(driver):
+    return _run_command("screenshot", driver, None, None, lambda page, timeout: page.screenshot(),
+                        lambda selenium_wait: driver.get_screenshot_as_png(), read_only=True)
+
+
+def report():
+    lines = [f"{'command':<12} {'cdp n':>6} {'cdp ms':>8} {'sel n':>6} {'sel ms':>8} {'saved ms':>9} {'total s':>8}"]
+    for command, paths in sorted(latencies.items()):
+        cdp, selenium = paths["cdp"], paths["selenium"]
+        cdp_ms = statistics.median(cdp) * 1000 if cdp else None
+        selenium_ms = statistics.median(selenium) * 1000 if selenium else None
+        saved = selenium_ms - cdp_ms if cdp and selenium else None
+        lines.append(f"{command:<12} {len(cdp):>6} {_ms(cdp_ms):>8} {len(selenium):>6} {_ms(selenium_ms):>8} "
+                     f"{_ms(saved):>9} {_ms(saved * len(cdp) / 1000 if saved is not None else None, 2):>8}"
+                     + (f"  ({fallbacks[command]} fallbacks)" if fallbacks.get(command) else ""))
+    return lines
+
+
+def _ms(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def close():
+    for page in pages.values():
+        try:
+            page.close()
+        except Exception:
+            pass
+    pages.clear()
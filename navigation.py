@@ -0,0 +1,127 @@
+import heapq
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+START = "start"
+SIGNED_IN = "*"  # Wildcard source for transitions available from every signed-in state
+
+# Default cost estimates in seconds until a transition has been measured
+PAGE_LOAD_COST = 3.0
+CLICK_COST = 1.0
+
+
+class AppState:
+    def __init__(self, name, route=None, ready=None, signed_in=True):
+        self.name = name
+        self.route = route  # Path appended to the base URL for a deep link
+        self.ready = ready  # Locator that proves the state has rendered
+        self.signed_in = signed_in
+        self.deep_link_ok = route is not None
+
+
+class Transition:
+    def __init__(self, source, target, actions, cost):
+        self.source = source
+        self.target = target
+        self.actions = actions
+        self.cost = cost
+        self.runs = 0
+
+    def record(self, seconds):
+        # Moving average so measured durations replace the initial estimate
+        self.runs += 1
+        self.cost = seconds if self.runs == 1 else 0.7 * self.cost + 0.3 * seconds
+
+
+class StateGraph:
+    # Page-state model of the app: each state has a deep-link route and the UI
+    # transitions between states; navigate_to() takes the cheapest known path
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.states = {START: AppState(START, signed_in=False)}
+        self.transitions = []
+        self.deep_links = {}
+
+    def add_state(self, name, route=None, ready=None, signed_in=True):
+        self.states[name] = AppState(name, route, ready, signed_in)
+        return self.states[name]
+
+    def add_transition(self, source, target, *actions, cost=None):
+        cost = CLICK_COST * len(actions) if cost is None else cost
+        self.transitions.append(Transition(source, target, actions, cost))
+
+    def detect(self, driver):
+        url = driver.current_url
+        for state in self.states.values():
+            if state.route and url.startswith(self.base_url + state.route):
+                return state.name
+        return START
+
+    def _edges(self, name):
+        state = self.states[name]
+        for transition in self.transitions:
+            if transition.source == name or (transition.source == SIGNED_IN and state.signed_in):
+                if transition.target != name:
+                    yield transition
+        if state.signed_in:
+            for target in self.states.values():
+                if target.name != name and target.signed_in and target.deep_link_ok:
+                    yield self.deep_links.setdefault(
+                        target.name, Transition(SIGNED_IN, target.name, (), PAGE_LOAD_COST))
+
+    def shortest_path(self, source, target):
+        queue = [(0.0, 0, source, [])]
+        seen = set()
+        counter = 1
+        while queue:
+            cost, _, name, path = heapq.heappop(queue)
+            if name == target:
+                return path
+            if name in seen:
+                continue
+            seen.add(name)
+            for edge in self._edges(name):
+                if edge.target not in seen:
+                    heapq.heappush(queue, (cost + edge.cost, counter, edge.target, path + [edge]))
+                    counter += 1
+        raise ValueError(f"No path from '{source}' to '{target}'")
+
+    def _deep_link(self, driver, wait, state):
+        driver.get(self.base_url + state.route)
+        try:
+            WebDriverWait(driver, min(wait._timeout, 15)).until(
+                EC.presence_of_element_located(state.ready))
+            return True
+        except TimeoutException:
+            # Route redirected or never rendered; stop offering it this session
+            state.deep_link_ok = False
+            return False
+
+    def navigate_to(self, driver, wait, target, fresh=True):
+        # fresh=True guarantees the target is reached through a page load, so no
+        # dialog or overlay from an earlier test is left in the document
+        current = self.detect(driver)
+        if fresh and self.states[current].signed_in:
+            state = self.states[target]
+            if state.deep_link_ok and self._traverse(driver, wait, self.deep_links.setdefault(
+                    target, Transition(SIGNED_IN, target, (), PAGE_LOAD_COST))):
+                return target
+            driver.refresh()
+            current = self.detect(driver)
+        while current != target:
+            edge = self.shortest_path(current, target)[0]
+            current = edge.target if self._traverse(driver, wait, edge) else self.detect(driver)
+        return current
+
+    def _traverse(self, driver, wait, edge):
+        start = time.perf_counter()
+        if edge.actions:
+            for action in edge.actions:
+                action(driver, wait)
+        elif not self._deep_link(driver, wait, self.states[edge.target]):
+            return False
+        edge.record(time.perf_counter() - start)
+        return True
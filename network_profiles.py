@@ -0,0 +1,45 @@
+import re
+
+# Named network conditions for CDP Network.emulateNetworkConditions; throughput is
+# in bytes/s, latency in ms (values follow the DevTools / Puppeteer presets)
+PROFILES = {
+    "none": {"offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1},
+    "offline": {"offline": True, "latency": 0, "downloadThroughput": 0, "uploadThroughput": 0},
+    "slow-3g": {"offline": False, "latency": 2000,
+                "downloadThroughput": 500 * 1000 / 8 * 0.8, "uploadThroughput": 500 * 1000 / 8 * 0.8},
+    "fast-3g": {"offline": False, "latency": 562.5,
+                "downloadThroughput": 1600 * 1000 / 8 * 0.9, "uploadThroughput": 750 * 1000 / 8 * 0.9},
+    "4g": {"offline": False, "latency": 165,
+           "downloadThroughput": 9000 * 1000 / 8 * 0.9, "uploadThroughput": 1500 * 1000 / 8 * 0.9},
+}
+
+
+def parse_profile(spec):
+    # "slow-3g" or "custom:latency=300,down=1000,up=500" (kbit/s)
+    if spec in PROFILES:
+        return spec, PROFILES[spec]
+    match = re.fullmatch(r"custom:(.+)", spec)
+    if not match:
+        raise ValueError(f"Unknown network profile '{spec}' (known: {', '.join(PROFILES)}, custom:...)")
+    values = dict(part.split("=", 1) for part in match.group(1).split(","))
+    conditions = {
+        "offline": False,
+        "latency": float(values.get("latency", 0)),
+        "downloadThroughput": float(values["down"]) * 1000 / 8 if "down" in values else -1,
+        "uploadThroughput": float(values["up"]) * 1000 / 8 if "up" in values else -1,
+    }
+    return spec, conditions
+
+
+def parse_profiles(specs):
+    return dict(parse_profile(spec.strip()) for spec in specs.split(",") if spec.strip())
+
+
+def apply_profile(driver, conditions):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", conditions)
+
+
+def reset(driver):
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", PROFILES["none"])
+
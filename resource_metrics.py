@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from step_hooks import add_step_parameter
+
+# Performance.getMetrics names recorded as per-step deltas
+TRACKED_METRICS = ("JSHeapUsedSize", "Nodes", "JSEventListeners", "LayoutCount",
+                   "RecalcStyleCount", "ScriptDuration", "TaskDuration")
+# Metrics whose post-step value should not keep climbing across runs of a step
+LEAK_METRICS = ("JSHeapUsedSize", "Nodes", "JSEventListeners")
+
+
+def get_metrics(driver):
+    metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    return {m["name"]: m["value"] for m in metrics}
+
+
+class ResourceMetricsCollector:
+    # Samples CDP Performance.getMetrics before and after every step and flags
+    # steps whose heap, DOM node or listener count grows on each repeated run
+    def __init__(self, growth_window=3):
+        self.growth_window = growth_window
+        self.enabled_sessions = set()
+        self.before = {}
+        self.history = defaultdict(lambda: defaultdict(list))
+        self.suspects = {}
+
+    def before_step(self, driver, name):
+        if driver.session_id not in self.enabled_sessions:
+            driver.execute_cdp_cmd("Performance.enable", {})
+            self.enabled_sessions.add(driver.session_id)
+        self.before[(driver.session_id, name)] = get_metrics(driver)
+
+    def after_step(self, driver, name, record, error):
+        before = self.before.pop((driver.session_id, name), None)
+        if before is None:
+            return
+        after = get_metrics(driver)
+        deltas = {}
+        for metric in TRACKED_METRICS:
+            if metric in before and metric in after:
+                delta = after[metric] - before[metric]
+                deltas[metric] = round(delta, 4) if isinstance(delta, float) else delta
+                add_step_parameter(f"Δ {metric}", deltas[metric])
+        record["metrics"] = deltas
+
+        growing = []
+        for metric in LEAK_METRICS:
+            if metric not in after:
+                continue
+            values = self.history[name][metric]
+            values.append(after[metric])
+            window = values[-self.growth_window:]
+            if len(window) == self.growth_window and all(a < b for a, b in zip(window, window[1:])):
+                growing.append(metric)
+        if growing:
+            record["growth"] = growing
+            self.suspects[name] = growing
+            add_step_parameter("monotonic growth", ", ".join(growing))
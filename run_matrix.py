@@ -0,0 +1,36 @@
+# Side-by-side reporting for tests parametrised over a run matrix (network, CPU, ...)
+
+
+def format_matrix(results, columns, unit="s"):
+    # results: {row: {column: {"outcome": ..., "duration": ...}}} -> table lines
+    width = max([len(row) for row in results] + [4])
+    lines = [f"{'':<{width}}  " + "  ".join(f"{str(column):>16}" for column in columns)]
+    for row in sorted(results):
+        cells = []
+        for column in columns:
+            run = results[row].get(column)
+            cells.append(f"{run['outcome'].upper():>6} {run['duration']:7.1f}{unit}" if run else "-")
+        lines.append(f"{row:<{width}}  " + "  ".join(f"{cell:>16}" for cell in cells))
+    return lines
+
+
+def step_matrix(records, runs, dimension, field="duration"):
+    # Average `field` of every step record per value of `dimension`
+    grouped = {}
+    for record in records:
+        value = runs.get(record["test"], {}).get(dimension)
+        if value is not None:
+            grouped.setdefault(record["step"], {}).setdefault(value, []).append(record)
+    return {step: {value: {"outcome": "failed" if any(r["status"] == "failed" for r in group) else "passed",
+                           "duration": sum(r.get(field, 0) for r in group) / len(group)}
+                   for value, group in by_value.items()}
+            for step, by_value in grouped.items()}
+
+
+def sensitivity(table, baseline, worst):
+    # Steps ordered by how much slower they get from `baseline` to `worst`
+    ratios = []
+    for step, by_value in table.items():
+        if baseline in by_value and worst in by_value and by_value[baseline]["duration"] > 0:
+            ratios.append((step, by_value[worst]["duration"] / by_value[baseline]["duration"]))
+    return sorted(ratios, key=lambda item: item[1], reverse=True)
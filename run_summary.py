@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import statistics
+
+# Compact run summary read in one pass over allure-results (only *-result.json files,
+# attachments are never opened) and compared with the previous run's summary.
+#   python run_summary.py allure-results -o run-summary.json --text run-summary.txt \
+#       --previous previous/run-summary.json
+
+FAILING = ("failed", "broken")
+SLOWEST = 10
+DELTA_RATIO = 0.2  # Timing changes smaller than 20% ...
+DELTA_MIN_S = 1.0  # ... or one second are noise
+
+
+def _walk_steps(node, test, steps):
+    for step in node.get("steps", []):
+        if "start" in step and "stop" in step:
+            steps.append({"step": step.get("name"), "test": test,
+                          "duration": round((step["stop"] - step["start"]) / 1000, 3)})
+        _walk_steps(step, test, steps)
+
+
+def read_results(results_dir):
+    tests, steps_by_test = {}, {}
+    first_start, last_stop = None, None
+    for entry in os.scandir(results_dir):
+        if not entry.name.endswith("-result.json"):
+            continue
+        with open(entry.path) as source:
+            result = json.load(source)
+        key = result.get("historyId") or result.get("fullName") or result.get("name")
+        name = result.get("fullName") or result.get("name")
+        start, stop = result.get("start"), result.get("stop")
+        if start is not None:
+            first_start = start if first_start is None else min(first_start, start)
+        if stop is not None:
+            last_stop = stop if last_stop is None else max(last_stop, stop)
+        # Reruns of a test share its historyId; the latest attempt counts
+        if key in tests and (tests[key]["stop"] or 0) > (stop or 0):
+            continue
+        parameters = {p["name"]: p["value"] for p in result.get("parameters", [])}
+        tests[key] = {
+            "name": name + (f" [{', '.join(f'{k}={v}' for k, v in parameters.items())}]" if parameters else ""),
+            "status": result.get("status", "unknown"),
+            "duration": round((stop - start) / 1000, 3) if start is not None and stop is not None else None,
+            "message": ((result.get("statusDetails") or {}).get("message") or "").strip().split("\n")[0],
+            "stop": stop,
+        }
+        steps_by_test[key] = []
+        _walk_steps(result, tests[key]["name"], steps_by_test[key])
+    steps = [step for test_steps in steps_by_test.values() for step in test_steps]
+    for test in tests.values():
+        del test["stop"]
+    wall = round((last_stop - first_start) / 1000, 1) if first_start is not None and last_stop is not None else None
+    return tests, steps, wall
+
+
+def _step_medians(steps):
+    durations = {}
+    for step in steps:
+        durations.setdefault(step["step"], []).append(step["duration"])
+    return {name: round(statistics.median(values), 3) for name, values in durations.items()}
+
+
+def _significant(before, after):
+    return before is not None and after is not None and abs(after - before) >= DELTA_MIN_S and \
+        abs(after - before) >= DELTA_RATIO * max(before, 0.001)
+
+
+def summarise(results_dir, previous=None):
+    tests, steps, wall = read_results(results_dir)
+    counts = {}
+    for test in tests.values():
+        counts[test["status"]] = counts.get(test["status"], 0) + 1
+    summary = {
+        "total": len(tests),
+        "counts": counts,
+        "wall_time": wall,
+        "failures": sorted(test["name"] for test in tests.values() if test["status"] in FAILING),
+        "slowest_steps": sorted(steps, key=lambda s: s["duration"], reverse=True)[:SLOWEST],
+        # Kept so the next run can compare against this one
+        "tests": {key: {"name": t["name"], "status": t["status"], "duration": t["duration"]} for key, t in tests.items()},
+        "step_medians": _step_medians(steps),
+    }
+    if previous:
+        before = previous.get("tests", {})
+        summary["new_failures"] = sorted(
+            (t["name"], t["message"]) for key, t in tests.items()
+            if t["status"] in FAILING and before.get(key, {}).get("status") not in FAILING)
+        summary["fixed"] = sorted(
+            t["name"] for key, t in tests.items()
+            if t["status"] == "passed" and before.get(key, {}).get("status") in FAILING)
+        summary["test_deltas"] = sorted((
+            {"name": t["name"], "before": before[key]["duration"], "after": t["duration"],
+             "delta": round(t["duration"] - before[key]["duration"], 3)}
+            for key, t in tests.items()
+            # A failed attempt's time says nothing about the test's speed
+            if key in before and t["status"] == before[key]["status"] == "passed"
+            and _significant(before[key]["duration"], t["duration"])
+        ), key=lambda d: abs(d["delta"]), reverse=True)
+        previous_steps = previous.get("step_medians", {})
+        summary["step_deltas"] = sorted((
+            {"step": name, "before": previous_steps[name], "after": median,
+             "delta": round(median - previous_steps[name], 3)}
+            for name, median in summary["step_medians"].items()
+            if _significant(previous_steps.get(name), median)
+        ), key=lambda d: abs(d["delta"]), reverse=True)
+    return summary
+
+
+def format_text(summary):
+    counts = summary["counts"]
+    order = ["passed", "failed", "broken", "skipped", "unknown"]
+    lines = [f"{summary['total']} tests: " + ", ".join(f"{counts[s]} {s}" for s in order if counts.get(s))
+             + (f" in {summary['wall_time']}s" if summary["wall_time"] is not None else "")]
+    if "new_failures" in summary:
+        if summary["new_failures"]:
+            lines.append("\nNew failures:")
+            lines += [f"  {name}" + (f": {message}" if message else "") for name, message in summary["new_failures"]]
+        if summary["fixed"]:
+            lines.append("\nFixed:")
+            lines += [f"  {name}" for name in summary["fixed"]]
+        still = [name for name in summary["failures"] if name not in {n for n, _ in summary["new_failures"]}]
+        if still:
+            lines.append(f"\nStill failing: {len(still)}")
+    elif summary["failures"]:
+        lines.append("\nFailures:")
+        lines += [f"  {name}" for name in summary["failures"]]
+    lines.append("\nSlowest steps:")
+    lines += [f"  {s['duration']:8.3f}s  {s['step']}  ({s['test']})" for s in summary["slowest_steps"]]
+    for title, key, label in (("Test timing changes", "test_deltas", "name"), ("Step timing changes", "step_deltas", "step")):
+        if summary.get(key):
+            lines.append(f"\n{title}:")
+            lines += [f"  {d['delta']:+8.3f}s  {d[label]}  ({d['before']}s -> {d['after']}s)" for d in summary[key][:SLOWEST]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise allure-results and compare with the previous run")
+    parser.add_argument("results", nargs="?", default="allure-results")
+    parser.add_argument("-o", "--output", default="run-summary.json")
+    parser.add_argument("--text", default=None, help="Also write the text summary here (it is always printed)")
+    parser.add_argument("--previous", default=None,
+                        help="Summary JSON of the previous run (defaults to the existing --output file)")
+    args = parser.parse_args()
+
+    previous = None
+    previous_path = args.previous or args.output
+    if os.path.exists(previous_path):
+        with open(previous_path) as source:
+            previous = json.load(source)
+    summary = summarise(args.results, previous)
+    with open(args.output, "w") as output:
+        json.dump(summary, output, indent=1)
+    text = format_text(summary)
+    if args.text:
+        with open(args.text, "w") as output:
+            output.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import shutil
+import uuid
+
+# Duration-balanced sharding of collected tests, plus merging of per-shard
+# allure-results and duration files.
+#   pytest test_script.py --shard-count 3 --shard-index 0 --alluredir=shard-0/allure-results
+#   python sharding.py merge shard-*/allure-results -o allure-results
+#   python sharding.py merge-durations shard-*/.test-durations.json -o .test-durations.json
+
+DEFAULT_DURATION = 5.0
+
+
+def load_durations(path):
+    try:
+        with open(path) as durations:
+            return json.load(durations)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(path, measured):
+    # Moving average with the stored history so one slow run doesn't dominate
+    durations = load_durations(path)
+    for node_id, seconds in measured.items():
+        previous = durations.get(node_id)
+        durations[node_id] = round(seconds if previous is None else 0.5 * previous + 0.5 * seconds, 3)
+    with open(path, "w") as output:
+        json.dump(durations, output, indent=2, sort_keys=True)
+
+
+def _call_signature(call):
+    name = call.func.id if isinstance(call.func, ast.Name) else ast.unparse(call.func)
+    literals = [repr(a.value) for a in call.args if isinstance(a, ast.Constant)]
+    return f"{name}({', '.join(literals)})"
+
+
+def call_sequences(path):
+    # Ordered step calls made directly by each test function in a module
+    tree = ast.parse(open(path).read())
+    sequences = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
+            calls = [n for n in ast.walk(node) if isinstance(n, ast.Call) and isinstance(n.func, ast.Name)]
+            calls.sort(key=lambda c: (c.lineno, c.col_offset))
+            sequences[node.name] = [_call_signature(c) for c in calls if c.func.id not in ("print",)]
+    return sequences
+
+
+def prefix_groups(items):
+    # Tests with the same setup chain, or whose chain is another test's full flow,
+    # stay together so shard-local browser and navigation reuse still pays off
+    parent = {item.nodeid: item.nodeid for item in items}
+
+    def find(node_id):
+        while parent[node_id] != node_id:
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    by_module = {}
+    for item in items:
+        by_module.setdefault(str(item.fspath), []).append(item)
+    for path, module_items in by_module.items():
+        try:
+            sequences = call_sequences(path)
+        except (OSError, SyntaxError):
+            continue
+        chains, flows = {}, {}
+        for item in module_items:
+            sequence = sequences.get(item.originalname or item.name)
+            if not sequence:
+                continue
+            chains.setdefault(tuple(sequence[:-1]), []).append(item.nodeid)
+            flows.setdefault(tuple(sequence), []).append(item.nodeid)
+        for chain, members in chains.items():
+            if not chain:
+                continue  # Single-call tests share no setup with each other
+            related = members + flows.get(chain, [])
+            for node_id in related[1:]:
+                parent[find(node_id)] = find(related[0])
+
+    groups = {}
+    for item in items:
+        groups.setdefault(find(item.nodeid), []).append(item)
+    return list(groups.values())
+
+
+def assign_shards(groups, durations, shard_count):
+    # Longest-processing-time first: biggest group goes to the least loaded shard
+    known = sorted(durations.values())
+    fallback = known[len(known) // 2] if known else DEFAULT_DURATION
+
+    def weight(group):
+        return sum(durations.get(item.nodeid, fallback) for item in group)
+
+    loads = [0.0] * shard_count
+    shards = [[] for _ in range(shard_count)]
+    for group in sorted(groups, key=weight, reverse=True):
+        index = loads.index(min(loads))
+        shards[index].extend(group)
+        loads[index] += weight(group)
+    return shards, loads
+
+
+def _rewrite_attachments(node, renames):
+    for attachment in node.get("attachments", []):
+        attachment["source"] = renames.get(attachment["source"], attachment["source"])
+    for step in node.get("steps", []):
+        _rewrite_attachments(step, renames)
+    for fixture in node.get("befores", []) + node.get("afters", []):
+        _rewrite_attachments(fixture, renames)
+
+
+def _same_file(a, b):
+    with open(a, "rb") as first, open(b, "rb") as second:
+        return first.read() == second.read()
+
+
+def merge_results(sources, output):
+    # Combine allure-results directories; identical files are written once and any
+    # uuid or attachment name already taken by another shard is re-keyed
+    os.makedirs(output, exist_ok=True)
+    for source in sources:
+        files = sorted(os.listdir(source))
+        renames = {}
+        for name in files:
+            target = os.path.join(output, name)
+            if not os.path.exists(target) or _same_file(os.path.join(source, name), target):
+                continue
+            if name.endswith("-result.json") or name.endswith("-container.json"):
+                renames[name[:36]] = str(uuid.uuid4())
+            elif "-attachment" in name:
+                renames[name] = str(uuid.uuid4()) + name[36:]
+        for name in files:
+            path = os.path.join(source, name)
+            if name.endswith("-result.json") or name.endswith("-container.json"):
+                with open(path) as result_file:
+                    data = json.load(result_file)
+                data["uuid"] = renames.get(data.get("uuid"), data.get("uuid"))
+                if "children" in data:
+                    data["children"] = [renames.get(child, child) for child in data["children"]]
+                _rewrite_attachments(data, renames)
+                with open(os.path.join(output, data["uuid"] + name[36:]), "w") as merged:
+                    json.dump(data, merged)
+            elif name in renames:
+                shutil.copyfile(path, os.path.join(output, renames[name]))
+            elif not os.path.exists(os.path.join(output, name)):
+                shutil.copyfile(path, os.path.join(output, name))
+    return len(os.listdir(output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sharded test outputs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="Merge allure-results directories")
+    merge.add_argument("sources", nargs="+")
+    merge.add_argument("-o", "--output", default="allure-results")
+    durations = commands.add_parser("merge-durations", help="Merge per-shard duration files")
+    durations.add_argument("sources", nargs="+")
+    durations.add_argument("-o", "--output", default=".test-durations.json")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        sources = [path for pattern in args.sources for path in sorted(glob.glob(pattern))]
+        count = merge_results(sources, args.output)
+        print(f"Merged {len(sources)} result directories into {args.output} ({count} files)")
+    else:
+        combined = {}
+        for pattern in args.sources:
+            for path in sorted(glob.glob(pattern)):
+                combined.update(load_durations(path))
+        with open(args.output, "w") as output:
+            json.dump(combined, output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import functools
+import inspect
+import time
+
+import allure
+from allure_commons import plugin_manager
+from allure_commons.model2 import Parameter, TestStepResult
+
+# Observers get before_step(driver, name) and after_step(driver, name, record, error)
+# around every helper decorated with @step; they may add fields to `record`. An
+# observer with skip_step(driver, name) can replace the step entirely, and one with
+# step_passed(driver, name, record) hears about steps that passed every after_step check.
+observers = []
+records = []
+current_test = None
+
+
+class StepCheckFailed(AssertionError):
+    # Raised by an observer's after_step to fail a step that otherwise passed
+    pass
+
+
+def register(observer):
+    if observer not in observers:
+        observers.append(observer)
+    return observer
+
+
+def unregister(observer):
+    if observer in observers:
+        observers.remove(observer)
+
+
+def add_step_parameter(name, value):
+    # Append a parameter to the Allure step that is currently open
+    for plugin in plugin_manager.get_plugins():
+        logger = getattr(plugin, "allure_logger", None)
+        if logger is None:
+            continue
+        item = logger.get_last_item(TestStepResult)
+        if item is not None:
+            item.parameters.append(Parameter(name=name, value=str(value)))
+            return
+
+
+def _skip(driver, name):
+    # An observer's skip_step(driver, name) may return {"result": value} to stand in for the step
+    for observer in list(observers):
+        hook = getattr(observer, "skip_step", None)
+        if hook is not None:
+            skipped = hook(driver, name)
+            if skipped is not None:
+                return skipped
+    return None
+
+
+def _notify(method, *args):
+    failed = None
+    for observer in list(observers):
+        hook = getattr(observer, method, None)
+        if hook is not None:
+            try:
+                hook(*args)
+            except StepCheckFailed as e:
+                failed = failed or e  # Raised once every observer has seen the step
+            except Exception as e:
+                # Instrumentation must never fail the step it observes
+                print(f"{type(observer).__name__}.{method} failed for {args[1]}: {e}")
+    if failed is not None:
+        raise failed
+
+
+# Drop-in replacement for @allure.step on helpers taking `driver` first
+def step(title):
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def observed(driver, *args, **kwargs):
+            record = {"test": current_test, "step": name, "title": title}
+            skipped = _skip(driver, name)
+            if skipped is not None:
+                records.append(dict(record, duration=0.0, status="resumed"))
+                return skipped["result"]
+            _notify("before_step", driver, name)
+            start = time.perf_counter()
+            error = None
+            try:
+                result = func(driver, *args, **kwargs)
+                if isinstance(result, str):
+                    record["result"] = result  # Helpers return a status line
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record["duration"] = round(time.perf_counter() - start, 3)
+                record["status"] = "failed" if error else "passed"
+                records.append(record)
+                try:
+                    _notify("after_step", driver, name, record, error)
+                except StepCheckFailed:
+                    record["status"] = "failed"
+                    if error is None:
+                        raise
+                else:
+                    if error is None:
+                        _notify("step_passed", driver, name, record)
+
+        # allure formats the title from getfullargspec, which ignores functools.wraps
+        # but honours __signature__; without it "{state}" in a title raises KeyError
+        observed.__signature__ = inspect.signature(func)
+        return allure.step(title)(observed)
+
+    return decorator
@@ -0,0 +1,164 @@
+import json
+
+import pytest
+
+import budgets
+import step_hooks
+
+BUDGETS = {
+    "mode": "warn",
+    "defaults": {"max_duration_s": 30, "max_js_heap_mb": 300},
+    "steps": {"open_website": {"max_duration_s": 10, "max_requests": 120, "mode": "fail"}},
+    "pages": {
+        "dashboard": {"url": "/pages/dashboard", "max_lcp_ms": 4000},
+        "assign-skills": {"url": "/pages/assign-skills", "max_lcp_ms": 4000, "max_js_heap_mb": 200},
+    },
+}
+MB = 1024 * 1024
+
+
+def _load(tmp_path, content=BUDGETS, mode=None):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps(content))
+    return budgets.load_budgets(str(path), mode)
+
+
+def test_load_budgets_applies_mode_override(tmp_path):
+    assert _load(tmp_path)["mode"] == "warn"
+    loaded = _load(tmp_path, mode="fail")
+    assert loaded["mode"] == "fail"
+    assert "mode" not in loaded["steps"]["open_website"]
+    assert loaded["pages"]["dashboard"]["pattern"].search("https://app/pages/dashboard")
+
+
+@pytest.mark.parametrize("content, message", [
+    ({"mode": "strict"}, "Budget mode must be one of fail, warn"),
+    ({"pages": {"home": {"url": "/", "max_lcp": 100}}}, "Unknown budget keys"),
+])
+def test_load_budgets_rejects_invalid_files(tmp_path, content, message):
+    with pytest.raises(ValueError, match=message):
+        _load(tmp_path, content)
+
+
+def test_limits_for_prefers_step_over_page_over_defaults(tmp_path):
+    loaded = _load(tmp_path)
+    limits = budgets.limits_for(loaded, "open_website", "https://app/pages/assign-skills")
+    assert limits == {
+        "max_duration_s": (10, "fail", "step open_website"),
+        "max_js_heap_mb": (200, "warn", "page assign-skills"),
+        "max_lcp_ms": (4000, "warn", "page assign-skills"),
+        "max_requests": (120, "fail", "step open_website"),
+    }
+    assert budgets.limits_for(loaded, "submit_form", None) == {
+        "max_duration_s": (30, "warn", "defaults"), "max_js_heap_mb": (300, "warn", "defaults")}
+
+
+def test_check_reports_only_exceeded_limits(tmp_path):
+    limits = budgets.limits_for(_load(tmp_path), "open_website", "https://app/pages/dashboard")
+    violations = budgets.check({"duration": 12.5, "lcp_ms": None, "requests": 120, "js_heap_mb": 301}, limits)
+    assert [budgets.describe(v) for v in violations] == [
+        "duration 12.5s > 10s (step open_website)", "js_heap_mb 301MB > 300MB (defaults)"]
+    assert [v["mode"] for v in violations] == ["fail", "warn"]
+
+
+class Page:
+    # Stands in for the driver: READ_PAGE and Runtime.getHeapUsage answer from `states`
+    session_id = "session"
+
+    def __init__(self, url, *states):
+        self.current_url = url
+        self.states = list(states)
+        self.state = None
+
+    def execute_script(self, script, *args):
+        if script == budgets.READ_PAGE:
+            self.state = self.states.pop(0)
+            return {key: self.state[key] for key in ("origin", "lcp", "transfer", "requests")}
+        return None
+
+    def execute_cdp_cmd(self, method, params):
+        if method == "Runtime.getHeapUsage":
+            return {"usedSize": self.state["heap"]}
+        return {}
+
+
+def _page(origin, lcp=1000, transfer=0, requests=0, heap=100):
+    return {"origin": origin, "lcp": lcp, "transfer": transfer, "requests": requests, "heap": heap * MB}
+
+
+def _run_step(checker, driver, name, duration=1.0):
+    record = {"test": "test_x", "title": name, "duration": duration}
+    checker.before_step(driver, name)
+    checker.after_step(driver, name, record, None)
+    return record
+
+
+def test_checker_measures_lcp_only_on_the_step_that_loaded_the_page(tmp_path):
+    checker = budgets.BudgetChecker(_load(tmp_path))
+    url = "https://app/pages/dashboard"
+    loaded = _run_step(checker, Page(url, _page(1.0, lcp=None), _page(2.0, lcp=5000, transfer=2048, requests=30)),
+                       "sign_in_to_dashboard")
+    assert loaded["budget_metrics"]["lcp_ms"] == 5000
+    assert loaded["budget_metrics"]["transfer_kb"] == 2.0
+    assert loaded["budget_metrics"]["requests"] == 30
+    assert [v["metric"] for v in loaded["budget_violations"]] == ["lcp_ms"]
+
+    same_page = _run_step(checker, Page(url, _page(2.0, lcp=5000, requests=30), _page(2.0, lcp=5000, requests=32)),
+                          "click_dashboard_button")
+    assert same_page["budget_metrics"]["lcp_ms"] is None
+    assert same_page["budget_metrics"]["requests"] == 2
+    assert "budget_violations" not in same_page
+
+
+def test_checker_measures_heap_only_when_the_step_grew_it(tmp_path):
+    checker = budgets.BudgetChecker(_load(tmp_path))
+    url = "https://app/pages/assign-skills"
+    grew = _run_step(checker, Page(url, _page(1.0, heap=150), _page(1.0, heap=250)), "submit_form")
+    assert grew["budget_metrics"]["js_heap_mb"] == 250
+    assert [v["metric"] for v in grew["budget_violations"]] == ["js_heap_mb"]
+    steady = _run_step(checker, Page(url, _page(1.0, heap=250), _page(1.0, heap=240)), "submit_form")
+    assert steady["budget_metrics"]["js_heap_mb"] is None
+    assert "budget_violations" not in steady
+    assert len(checker.violations) == 1
+
+
+def test_checker_leaves_page_metrics_to_the_innermost_step(tmp_path):
+    checker = budgets.BudgetChecker(_load(tmp_path))
+    # sign_in_to_dashboard -> open_website, which loads the slow dashboard
+    driver = Page("https://app/pages/dashboard", _page(1.0, lcp=None), _page(1.0, lcp=None),
+                  _page(2.0, lcp=5000, requests=30))
+    outer = {"test": "test_x", "title": "sign_in_to_dashboard", "duration": 12.0}
+    checker.before_step(driver, "sign_in_to_dashboard")
+    inner = _run_step(checker, driver, "open_website")
+    checker.after_step(driver, "sign_in_to_dashboard", outer, None)
+    assert inner["budget_metrics"]["lcp_ms"] == 5000
+    assert [v["metric"] for v in inner["budget_violations"]] == ["lcp_ms"]
+    assert outer["budget_metrics"] == {"duration": 12.0, "lcp_ms": None, "transfer_kb": None, "requests": None,
+                                       "js_heap_mb": None}
+    assert "budget_violations" not in outer
+    assert checker.open == {"session": []}
+
+
+def test_failing_budget_fails_the_step_after_every_observer_ran(tmp_path):
+    checker = budgets.BudgetChecker(_load(tmp_path))
+    seen = []
+
+    class Observer:
+        def after_step(self, driver, name, record, error):
+            seen.append(name)
+
+    @step_hooks.step("Open website")
+    def open_website(driver):
+        return "Website opened"
+
+    observers, recorded = step_hooks.observers[:], len(step_hooks.records)
+    step_hooks.observers[:] = [checker, Observer()]
+    try:
+        driver = Page("https://app/", _page(1.0), _page(2.0, requests=121))
+        with pytest.raises(budgets.BudgetExceeded, match="Performance budget exceeded in 'Open website'"):
+            open_website(driver)
+        assert seen == ["open_website"]
+        assert step_hooks.records[-1]["status"] == "failed"
+    finally:
+        step_hooks.observers[:] = observers
+        del step_hooks.records[recorded:]  # Keep it out of the run's step timings
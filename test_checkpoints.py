@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+import checkpoints
+import step_hooks
+
+SKILLS = "https://app/pages/assign-skills"
+PROFILE = "https://app/pages/user-profile"
+
+
+def _checkpoint(step, url, restorable=True, fields=(), result="done"):
+    return {"step": step, "result": result, "state": {
+        "url": url, "restorable": restorable, "fields": [{"path": path, "value": "1"} for path in fields],
+        "local": {}, "session": {}, "cookies": []}}
+
+
+def _actions(plan):
+    return [(checkpoint["step"], checkpoint["action"]) for checkpoint in plan]
+
+
+# test_submit_form failing in submit_form: every step before it passed inside the dialog
+SUBMIT_FORM = [
+    _checkpoint("navigate_to", SKILLS),
+    _checkpoint("click_add_skills_button", SKILLS, restorable=False),
+    _checkpoint("select_category", SKILLS, restorable=False),
+    _checkpoint("select_skill", SKILLS, restorable=False),
+    _checkpoint("fill_experience", SKILLS, restorable=False, fields=["exp"]),
+    _checkpoint("fill_version", SKILLS, restorable=False, fields=["exp", "ver"]),
+    _checkpoint("fill_description", SKILLS, restorable=False, fields=["exp", "ver", "desc"]),
+]
+
+
+def test_plan_replays_dialog_steps_and_applies_fields():
+    assert _actions(checkpoints.plan_resume(SUBMIT_FORM)) == [
+        ("navigate_to", "restore"),
+        ("click_add_skills_button", "replay"),
+        ("select_category", "replay"),
+        ("select_skill", "replay"),
+        ("fill_experience", "skip"),
+        ("fill_version", "skip"),
+        ("fill_description", "fill"),
+    ]
+
+
+def test_plan_restores_only_the_last_of_consecutive_url_checkpoints():
+    saved = [_checkpoint("open_website", "https://app/"), _checkpoint("sign_in_to_dashboard", "https://app/pages"),
+             _checkpoint("click_user_profile", PROFILE)]
+    assert _actions(checkpoints.plan_resume(saved)) == [
+        ("open_website", "skip"), ("sign_in_to_dashboard", "skip"), ("click_user_profile", "restore")]
+
+
+def test_plan_never_stands_in_for_verification_or_unrecorded_results():
+    saved = [_checkpoint("navigate_to", PROFILE),
+             _checkpoint("verify_profile_detail", PROFILE, result="Name verified: Pratik"),
+             _checkpoint("verify_profile_table", PROFILE, result=None),
+             _checkpoint("navigate_to", SKILLS)]
+    assert _actions(checkpoints.plan_resume(saved)) == [
+        ("navigate_to", "restore"), ("verify_profile_detail", "replay"),
+        ("verify_profile_table", "replay"), ("navigate_to", "restore")]
+
+
+def test_plan_drops_trailing_replays():
+    saved = [_checkpoint("navigate_to", PROFILE), _checkpoint("verify_profile_table", PROFILE, result=None)]
+    assert _actions(checkpoints.plan_resume(saved)) == [("navigate_to", "restore")]
+    assert checkpoints.plan_resume([_checkpoint("verify_profile_table", PROFILE, result=None)]) == []
+
+
+class Driver:
+    session_id = "session"
+
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(("fields", args[0]) if script == checkpoints.APPLY_FIELDS else ("script",))
+        return True
+
+    def execute_cdp_cmd(self, method, params):
+        self.calls.append((method,))
+        return {"identifier": "1"}
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+
+def _recorder(tmp_path, saved):
+    recorder = checkpoints.CheckpointRecorder(str(tmp_path), resume=True)
+    with open(recorder.path("test_submit_form"), "w") as output:
+        json.dump(saved, output)
+    recorder.begin("test_submit_form")
+    return recorder
+
+
+def test_recorder_follows_the_plan(tmp_path):
+    recorder, driver = _recorder(tmp_path, SUBMIT_FORM), Driver()
+    assert recorder.skip_step(driver, "navigate_to") == {"result": "done"}
+    assert ("get", SKILLS) in driver.calls
+    for name in ("click_add_skills_button", "select_category", "select_skill"):
+        assert recorder.skip_step(driver, name) is None  # Runs for real
+    assert recorder.skip_step(driver, "fill_experience") == {"result": "done"}
+    assert recorder.skip_step(driver, "fill_version") == {"result": "done"}
+    driver.calls.clear()
+    assert recorder.skip_step(driver, "fill_description") == {"result": "done"}
+    assert driver.calls == [("fields", SUBMIT_FORM[-1]["state"]["fields"])]
+    assert recorder.skip_step(driver, "submit_form") is None
+    assert [checkpoint["step"] for checkpoint in recorder.checkpoints] == [
+        "navigate_to", "fill_experience", "fill_version", "fill_description"]
+
+
+def test_recorder_discards_checkpoints_that_no_longer_match(tmp_path):
+    recorder = _recorder(tmp_path, SUBMIT_FORM)
+    with pytest.raises(checkpoints.CheckpointMismatch, match="expected step 'navigate_to'"):
+        recorder.skip_step(Driver(), "open_website")
+    assert not (tmp_path / "test_submit_form.json").exists()
+    assert recorder.skip_step(Driver(), "navigate_to") is None
+
+
+class Page(Driver):
+    def execute_script(self, script, *args):
+        return {"url": SKILLS, "restorable": True, "fields": [], "local": {}, "session": {}}
+
+    def execute_cdp_cmd(self, method, params):
+        return {"cookies": []}
+
+
+def test_recorder_skips_steps_failed_by_another_observer(tmp_path):
+    recorder = checkpoints.CheckpointRecorder(str(tmp_path))
+
+    class JsErrors:
+        def after_step(self, driver, name, record, error):
+            if name == "submit_form":
+                raise step_hooks.StepCheckFailed("Uncaught TypeError")
+
+    @step_hooks.step("Navigate")
+    def navigate_to(driver):
+        return "Navigated"
+
+    @step_hooks.step("Submit form")
+    def submit_form(driver):
+        return "Form submitted"
+
+    observers, recorded = step_hooks.observers[:], len(step_hooks.records)
+    step_hooks.observers[:] = [recorder, JsErrors()]
+    try:
+        recorder.begin("test_submit_form")
+        navigate_to(Page())
+        with pytest.raises(step_hooks.StepCheckFailed):
+            submit_form(Page())
+        recorder.finish("test_submit_form", False)
+    finally:
+        step_hooks.observers[:] = observers
+        del step_hooks.records[recorded:]  # Keep it out of the run's step timings
+    saved = json.loads((tmp_path / "test_submit_form.json").read_text())
+    assert [checkpoint["step"] for checkpoint in saved] == ["navigate_to"]
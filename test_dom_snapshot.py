@@ -0,0 +1,124 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+import dom_snapshot
+
+URL = "https://dfperformance.azurewebsites.net/pages/user-profile"
+
+
+def _snapshot(tree):
+    # Flattens ("tag", {attrs}, [children], bounds, styles) / "text" into the
+    # string-table layout DOMSnapshot.captureSnapshot returns
+    strings = []
+
+    def string(value):
+        if value not in strings:
+            strings.append(value)
+        return strings.index(value)
+
+    nodes = {"parentIndex": [], "nodeType": [], "nodeName": [], "nodeValue": [], "attributes": []}
+    layout = {"nodeIndex": [], "bounds": [], "styles": []}
+
+    def add(node, parent):
+        index = len(nodes["parentIndex"])
+        nodes["parentIndex"].append(parent)
+        if isinstance(node, str):
+            nodes["nodeType"].append(dom_snapshot.TEXT_NODE)
+            nodes["nodeName"].append(string("#text"))
+            nodes["nodeValue"].append(string(node))
+            nodes["attributes"].append([])
+            return
+        tag, attrs, children = node[:3]
+        nodes["nodeType"].append(dom_snapshot.ELEMENT_NODE)
+        nodes["nodeName"].append(string(tag.upper()))
+        nodes["nodeValue"].append(-1)
+        nodes["attributes"].append([string(part) for pair in attrs.items() for part in pair])
+        if len(node) > 3:
+            styles = node[4] if len(node) > 4 else {}
+            layout["nodeIndex"].append(index)
+            layout["bounds"].append(node[3])
+            layout["styles"].append([string(styles.get(name, "")) for name in dom_snapshot.COMPUTED_STYLES])
+        for child in children:
+            add(child, index)
+
+    # The captured root is the document node above <html>
+    nodes["parentIndex"].append(-1)
+    nodes["nodeType"].append(9)
+    nodes["nodeName"].append(string("#document"))
+    nodes["nodeValue"].append(-1)
+    nodes["attributes"].append([])
+    add(tree, 0)
+    return {"strings": strings, "documents": [{"documentURL": string(URL), "nodes": nodes, "layout": layout}]}
+
+
+PAGE = ("html", {}, [
+    ("body", {}, [
+        ("div", {"id": "profile", "class": "card wide"}, [
+            ("p", {}, [("span", {}, ["Name:"]), " Pratik Wavhal"], [10, 20, 300, 18]),
+            ("p", {}, [("span", {}, ["Email:"]), " pratik@datafortune.com"], [10, 40, 300, 18]),
+            ("p", {"class": "hidden"}, [("span", {}, ["Designation:"])], [10, 60, 300, 18], {"display": "none"}),
+        ], [0, 0, 800, 600]),
+        ("div", {"class": "card"}, [("button", {"type": "submit"}, ["Save"], [0, 0, 0, 0])]),
+    ]),
+])
+
+
+def _texts(nodes):
+    return [node.text().strip() for node in nodes]
+
+
+def test_build_tree_resolves_strings_and_layout():
+    root = dom_snapshot.build_tree(_snapshot(PAGE))
+    assert root.tag == "#document" and root.elements[0].tag == "html"
+    profile = root.elements[0].elements[0].elements[0]
+    assert profile.attrs == {"id": "profile", "class": "card wide"}
+    assert profile.elements[0].bounds == [10, 20, 300, 18]
+    assert profile.elements[2].styles["display"] == "none"
+
+
+def test_evaluate_xpath():
+    root = dom_snapshot.build_tree(_snapshot(PAGE))
+    assert _texts(dom_snapshot.evaluate_xpath("//p[span[contains(text(),'Name:')]]", [root])) == [
+        "Name: Pratik Wavhal"]
+    assert _texts(dom_snapshot.evaluate_xpath("/html/body/div[1]/p[2]/span", [root])) == ["Email:"]
+    assert _texts(dom_snapshot.evaluate_xpath("//div[@id='profile']/p[last()]", [root])) == ["Designation:"]
+    assert _texts(dom_snapshot.evaluate_xpath("//button[.='Save' and @type='submit']", [root])) == ["Save"]
+    assert dom_snapshot.evaluate_xpath("//div[@id='missing']//p", [root]) == []
+
+
+def test_evaluate_css():
+    root = dom_snapshot.build_tree(_snapshot(PAGE))
+    assert len(dom_snapshot.evaluate_css("div.card p", root)) == 3
+    assert _texts(dom_snapshot.evaluate_css("#profile > p:nth-child(2) span", root)) == ["Email:"]
+    assert _texts(dom_snapshot.evaluate_css("div.card > [type=submit]", root)) == ["Save"]
+    assert dom_snapshot.evaluate_css("div.wide > button", root) == []
+
+
+def test_diagnose_reports_where_the_locator_stops_matching():
+    report = dom_snapshot.diagnose(_snapshot(PAGE), "xpath", "//div[@id='profile']/p/em")
+    lines = report.splitlines()
+    assert lines[1] == f"Document: {URL}"
+    assert "     1 match(es) after //div[@id='profile']" in lines
+    assert "     3 match(es) after /p" in lines
+    assert "     0 match(es) after /em" in lines
+    assert "    3 x span" in lines
+
+
+def test_diagnose_describes_visibility_of_matches():
+    report = dom_snapshot.diagnose(_snapshot(PAGE), "css selector", "p.hidden")
+    assert "Match p[@class='hidden']: at (10,60) size 300x18; display: none" in report
+    report = dom_snapshot.diagnose(_snapshot(PAGE), "tag name", "button")
+    assert "zero size" in report
+    report = dom_snapshot.diagnose(_snapshot(PAGE), "id", "profile")
+    assert "Match div[@id='profile'][@class='card wide']: at (0,0) size 800x600; visible" in report
+
+
+def test_diagnose_unsupported_strategy():
+    report = dom_snapshot.diagnose(_snapshot(PAGE), "link text", "Save")
+    assert "Could not evaluate offline: Unsupported locator strategy 'link text'" in report
+
+
+def test_locator_of_reads_expected_condition_closures():
+    locator = (By.XPATH, "//p")
+    assert dom_snapshot._locator_of(EC.visibility_of_element_located(locator)) == locator
+    assert dom_snapshot._locator_of(lambda driver: True) is None
@@ -0,0 +1,90 @@
+import json
+
+import run_summary
+
+
+def _result(directory, uuid, name, status, start, stop, steps=(), history=None, message=None, parameters=()):
+    result = {
+        "uuid": uuid, "name": name, "fullName": f"test_script#{name}", "historyId": history or name,
+        "status": status, "start": start, "stop": stop,
+        "steps": [{"name": step, "start": step_start, "stop": step_stop} for step, step_start, step_stop in steps],
+        "parameters": [{"name": key, "value": value} for key, value in parameters],
+    }
+    if message:
+        result["statusDetails"] = {"message": message + "\nTraceback ..."}
+    (directory / f"{uuid}-result.json").write_text(json.dumps(result))
+
+
+def _run(tmp_path, name, tests):
+    directory = tmp_path / name
+    directory.mkdir()
+    for test in tests:
+        _result(directory, **test)
+    (directory / "abc-attachment.png").write_bytes(b"\x89PNG not json")  # Never opened
+    return str(directory)
+
+
+PREVIOUS = [
+    dict(uuid="1", name="test_open_website", status="passed", start=0, stop=4000,
+         steps=[("Open the website", 0, 4000)]),
+    dict(uuid="2", name="test_submit_form", status="failed", start=4000, stop=20000,
+         steps=[("Open the website", 4000, 8000), ("Submit form", 8000, 20000)], message="Timeout"),
+    dict(uuid="3", name="test_edit_skill", status="passed", start=20000, stop=30000),
+]
+CURRENT = [
+    dict(uuid="1", name="test_open_website", status="passed", start=0, stop=10000,
+         steps=[("Open the website", 0, 10000)]),
+    dict(uuid="2", name="test_submit_form", status="passed", start=10000, stop=22000,
+         steps=[("Open the website", 10000, 14500), ("Submit form", 14500, 22000)]),
+    dict(uuid="3", name="test_edit_skill", status="broken", start=22000, stop=23000,
+         message="NoSuchElementException: edit button"),
+    # A rerun of test_edit_skill that finished earlier than the attempt above
+    dict(uuid="4", name="test_edit_skill", status="passed", start=21000, stop=21500),
+    dict(uuid="5", name="test_account_profile", status="passed", start=23000, stop=25000,
+         history="profile-qa", parameters=[("account", "'qa-two'")]),
+]
+
+
+def test_summarise_counts_and_slowest_steps(tmp_path):
+    summary = run_summary.summarise(_run(tmp_path, "current", CURRENT))
+    assert summary["total"] == 4
+    assert summary["counts"] == {"passed": 3, "broken": 1}
+    assert summary["wall_time"] == 25.0
+    assert summary["failures"] == ["test_script#test_edit_skill"]
+    assert summary["tests"]["profile-qa"]["name"] == "test_script#test_account_profile [account='qa-two']"
+    assert [(s["step"], s["duration"]) for s in summary["slowest_steps"]] == [
+        ("Open the website", 10.0), ("Submit form", 7.5), ("Open the website", 4.5)]
+    assert summary["step_medians"] == {"Open the website": 7.25, "Submit form": 7.5}
+    assert "new_failures" not in summary
+
+
+def test_summarise_compares_with_the_previous_run(tmp_path):
+    previous = run_summary.summarise(_run(tmp_path, "previous", PREVIOUS))
+    summary = run_summary.summarise(_run(tmp_path, "current", CURRENT), json.loads(json.dumps(previous)))
+    assert summary["new_failures"] == [("test_script#test_edit_skill", "NoSuchElementException: edit button")]
+    assert summary["fixed"] == ["test_script#test_submit_form"]
+    # 4 s -> 10 s is significant; submit_form was failing before, so its time is not compared
+    assert summary["test_deltas"] == [
+        {"name": "test_script#test_open_website", "before": 4.0, "after": 10.0, "delta": 6.0}]
+    # Open the website: median 4 s -> 7.25 s; Submit form 12 s -> 7.5 s
+    assert summary["step_deltas"] == [
+        {"step": "Submit form", "before": 12.0, "after": 7.5, "delta": -4.5},
+        {"step": "Open the website", "before": 4.0, "after": 7.25, "delta": 3.25},
+    ]
+
+
+def test_significant_ignores_noise():
+    assert not run_summary._significant(10.0, 10.9)  # Under a second
+    assert not run_summary._significant(30.0, 34.0)  # Under 20%
+    assert run_summary._significant(30.0, 37.0)
+    assert not run_summary._significant(None, 5.0)
+
+
+def test_format_text(tmp_path):
+    previous = run_summary.summarise(_run(tmp_path, "previous", PREVIOUS))
+    text = run_summary.format_text(run_summary.summarise(_run(tmp_path, "current", CURRENT), previous))
+    lines = text.splitlines()
+    assert lines[0] == "4 tests: 3 passed, 1 broken in 25.0s"
+    assert "  test_script#test_edit_skill: NoSuchElementException: edit button" in lines
+    assert "Still failing: 0" not in text
+    assert "    +6.000s  test_script#test_open_website  (4.0s -> 10.0s)" in lines
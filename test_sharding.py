@@ -0,0 +1,125 @@
+import json
+import os
+
+import sharding
+
+MODULE = """
+def open_website(driver): pass
+def sign_in(driver): pass
+def open_profile(driver): pass
+def verify(driver, field): pass
+
+def test_open(setup):
+    open_website(driver)
+
+def test_sign_in(setup):
+    open_website(driver)
+    sign_in(driver)
+
+def test_name(setup):
+    open_website(driver)
+    sign_in(driver)
+    verify(driver, "Name")
+
+def test_email(setup):
+    open_website(driver)
+    sign_in(driver)
+    verify(driver, "Email")
+
+def test_profile(setup):
+    open_profile(driver)
+"""
+
+
+class Item:
+    def __init__(self, path, name):
+        self.fspath = path
+        self.name = self.originalname = name
+        self.nodeid = f"test_module.py::{name}"
+
+
+def _items(tmp_path, names):
+    path = tmp_path / "test_module.py"
+    path.write_text(MODULE)
+    return [Item(path, name) for name in names]
+
+
+def _ids(groups):
+    return sorted(sorted(item.name for item in group) for group in groups)
+
+
+def test_prefix_groups_keeps_shared_chains_together(tmp_path):
+    items = _items(tmp_path, ["test_open", "test_sign_in", "test_name", "test_email", "test_profile"])
+    # test_name and test_email share the open+sign-in chain, which is test_sign_in's full
+    # flow; test_sign_in extends test_open's flow in turn
+    assert _ids(sharding.prefix_groups(items)) == [
+        ["test_email", "test_name", "test_open", "test_sign_in"], ["test_profile"]]
+
+
+def test_prefix_groups_leaves_unparseable_modules_ungrouped(tmp_path):
+    path = tmp_path / "test_broken.py"
+    path.write_text("def test_a(:\n")
+    items = [Item(path, "test_a"), Item(path, "test_b")]
+    assert _ids(sharding.prefix_groups(items)) == [["test_a"], ["test_b"]]
+
+
+def test_assign_shards_balances_by_duration(tmp_path):
+    items = _items(tmp_path, ["test_open", "test_sign_in", "test_name", "test_email", "test_profile"])
+    groups = [[item] for item in items]
+    durations = {items[0].nodeid: 10.0, items[1].nodeid: 6.0, items[2].nodeid: 4.0, items[3].nodeid: 2.0}
+    shards, loads = sharding.assign_shards(groups, durations, 2)
+    # test_profile has no history and weighs the median known duration (6.0 of 2/4/6/10)
+    assert loads == [14.0, 14.0]
+    assert sorted(item.name for item in shards[0]) == ["test_name", "test_open"]
+    assert sorted(item.name for item in shards[1]) == ["test_email", "test_profile", "test_sign_in"]
+
+
+def test_assign_shards_without_history_uses_default_duration(tmp_path):
+    items = _items(tmp_path, ["test_open", "test_sign_in", "test_name"])
+    shards, loads = sharding.assign_shards([[items[0], items[1]], [items[2]]], {}, 3)
+    assert loads == [2 * sharding.DEFAULT_DURATION, sharding.DEFAULT_DURATION, 0.0]
+    assert shards[2] == []
+
+
+def _write_shard(directory, result_uuid, name, attachment, attachment_body):
+    os.makedirs(directory)
+    with open(os.path.join(directory, f"{result_uuid}-result.json"), "w") as output:
+        json.dump({"uuid": result_uuid, "name": name, "steps": [
+            {"name": "step", "attachments": [{"name": "shot", "source": attachment}]}]}, output)
+    with open(os.path.join(directory, attachment), "w") as output:
+        output.write(attachment_body)
+    with open(os.path.join(directory, "environment.properties"), "w") as output:
+        output.write("browser=chrome\n")
+
+
+def test_merge_results_rekeys_colliding_uuids(tmp_path):
+    result_uuid = "11111111-2222-3333-4444-555555555555"
+    attachment = "aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee-attachment.png"
+    _write_shard(tmp_path / "shard-0", result_uuid, "test_a", attachment, "first")
+    _write_shard(tmp_path / "shard-1", result_uuid, "test_b", attachment, "second")
+    output = tmp_path / "merged"
+
+    count = sharding.merge_results([str(tmp_path / "shard-0"), str(tmp_path / "shard-1")], str(output))
+
+    assert count == 5  # Two results, two attachments, one shared environment file
+    results = [json.loads(path.read_text()) for path in output.glob("*-result.json")]
+    assert sorted(result["name"] for result in results) == ["test_a", "test_b"]
+    by_name = {result["name"]: result for result in results}
+    assert by_name["test_a"]["uuid"] == result_uuid
+    assert by_name["test_b"]["uuid"] != result_uuid
+    assert os.path.exists(output / f"{by_name['test_b']['uuid']}-result.json")
+    source = by_name["test_b"]["steps"][0]["attachments"][0]["source"]
+    assert source != attachment and source.endswith("-attachment.png")
+    assert (output / source).read_text() == "second"
+    assert (output / attachment).read_text() == "first"
+
+
+def test_merge_results_writes_identical_files_once(tmp_path):
+    result_uuid = "11111111-2222-3333-4444-555555555555"
+    attachment = "aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee-attachment.png"
+    _write_shard(tmp_path / "shard-0", result_uuid, "test_a", attachment, "same")
+    _write_shard(tmp_path / "shard-1", result_uuid, "test_a", attachment, "same")
+
+    count = sharding.merge_results([str(tmp_path / "shard-0"), str(tmp_path / "shard-1")], str(tmp_path / "merged"))
+
+    assert count == 3
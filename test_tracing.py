@@ -0,0 +1,79 @@
+import json
+
+import tracing
+
+MAIN, WORKER = (1, 10), (1, 11)
+
+
+def _event(thread, ph, name, ts=None, dur=None, **data):
+    event = {"pid": thread[0], "tid": thread[1], "ph": ph, "name": name}
+    if ts is not None:
+        event["ts"] = ts
+    if dur is not None:
+        event["dur"] = dur
+    if data:
+        event["args"] = {"data": data}
+    return event
+
+
+EVENTS = [
+    {"pid": 1, "tid": 10, "ph": "M", "name": "thread_name", "args": {"name": "CrRendererMain"}},
+    {"pid": 1, "tid": 11, "ph": "M", "name": "thread_name", "args": {"name": "DedicatedWorker thread"}},
+    _event(WORKER, "X", "FunctionCall", 0, 100),  # Off the main thread: only widens the window
+    # A task of 5 ms: 3.5 ms own scripting, a 1 ms layout and an uncategorised 0.5 ms child
+    # that counts as scripting because its parent is
+    _event(MAIN, "X", "FunctionCall", 1000, 5000),
+    _event(MAIN, "X", "Layout", 2000, 1000),
+    _event(MAIN, "X", "SomethingNew", 3500, 500),
+    _event(MAIN, "I", "ResourceSendRequest", 6000, requestId="r1"),
+    _event(MAIN, "I", "ResourceFinish", 9000, requestId="r1"),
+    _event(MAIN, "X", "Paint", 10000, 2000),
+    _event(MAIN, "I", "ResourceSendRequest", 15000, requestId="r2"),  # Never finishes
+    _event(MAIN, "X", "RunTask", 20000, 1000),
+]
+
+
+def _write(path, events, wrapped=True):
+    with open(path, "w") as output:
+        json.dump({"traceEvents": events, "metadata": {}} if wrapped else events, output, indent=1)
+    return str(path)
+
+
+def test_analyse_attributes_main_thread_time(tmp_path):
+    summary = tracing.analyse(_write(tmp_path / "trace.json", EVENTS))
+    assert summary == {
+        "scripting": 4.0, "style_layout": 1.0, "paint": 2.0, "loading": 0.0, "other": 1.0,
+        # r1 waits 3 ms with the main thread idle; r2 runs to the end of the trace, 5 of
+        # those 6 ms outside the last task
+        "network_idle": 8.0,
+        "idle": 5.0,  # 21 ms window - 8 ms busy - 8 ms waiting on the network
+        "window": 21.0,
+        "requests": 2,
+        "main_threads": 1,
+    }
+
+
+def test_analyse_without_renderer_main_thread(tmp_path):
+    events = [event for event in EVENTS if event.get("args", {}).get("name") != "CrRendererMain"]
+    summary = tracing.analyse(_write(tmp_path / "trace.json", events))
+    assert summary["main_threads"] == 0
+    assert summary["scripting"] == 0.0
+    assert summary["network_idle"] == 9.0  # Nothing is busy, so all of both requests' time counts
+
+
+def test_iter_trace_events_streams_across_chunks(tmp_path):
+    for wrapped in (True, False):
+        path = _write(tmp_path / f"trace-{wrapped}.json", EVENTS, wrapped)
+        assert list(tracing.iter_trace_events(path, chunk_size=64)) == EVENTS
+
+
+def test_iter_trace_events_truncated_trace(tmp_path):
+    path = tmp_path / "trace.json"
+    text = json.dumps({"traceEvents": EVENTS})
+    path.write_text(text[:text.index('"Paint"')])  # Chrome killed mid-write
+    assert list(tracing.iter_trace_events(str(path), chunk_size=64)) == EVENTS[:8]
+
+
+def test_trace_path_is_unique_within_a_second(tmp_path):
+    paths = {tracing.trace_path(str(tmp_path), "click_self_evaluation_button") for _ in range(5)}
+    assert len(paths) == 5
@@ -0,0 +1,269 @@
+import base64
+import contextlib
+import itertools
+import json
+import os
+import re
+import time
+
+import allure
+from allure_commons.types import AttachmentType
+
+from cdp_session import CdpSession
+
+# Chrome tracing around a step: the trace streams to disk through IO.read and a
+# single streaming pass attributes renderer main-thread time for the summary.
+#   python tracing.py traces/click_self_evaluation_button-<timestamp>-<n>.json
+
+TRACE_CATEGORIES = [
+    "devtools.timeline", "disabled-by-default-devtools.timeline", "disabled-by-default-devtools.timeline.frame",
+    "v8.execute", "blink.user_timing", "loading", "toplevel", "netlog", "__metadata",
+]
+READ_CHUNK = 1024 * 1024
+
+SCRIPTING = {"EvaluateScript", "FunctionCall", "v8.compile", "v8.compileModule", "v8.evaluateModule",
+             "v8.run", "TimerFire", "EventDispatch", "FireAnimationFrame", "FireIdleCallback", "RunMicrotasks",
+             "XHRReadyStateChange", "XHRLoad", "MinorGC", "MajorGC", "V8.GCScavenger", "V8.GCIncrementalMarking",
+             "V8.GCFinalizeMC", "CompileScript", "CompileCode", "OptimizeCode", "CacheScript"}
+STYLE_LAYOUT = {"UpdateLayoutTree", "RecalculateStyles", "Layout", "ParseAuthorStyleSheet", "UpdateLayerTree",
+                "HitTest", "IntersectionObserverController::computeIntersections"}
+PAINT = {"Paint", "PaintImage", "PrePaint", "CompositeLayers", "Layerize", "Commit", "DecodeImage",
+         "PaintSetup", "UpdateLayer"}
+LOADING = {"ParseHTML", "ResourceReceivedData", "ResourceReceiveResponse"}
+
+_sequence = itertools.count(1)
+
+
+def category(name):
+    if name in SCRIPTING:
+        return "scripting"
+    if name in STYLE_LAYOUT:
+        return "style_layout"
+    if name in PAINT:
+        return "paint"
+    if name in LOADING:
+        return "loading"
+    return None
+
+
+def iter_trace_events(path, chunk_size=READ_CHUNK):
+    # Incrementally decodes objects from the traceEvents array (or a bare array)
+    # without loading the whole file
+    decoder = json.JSONDecoder()
+    with open(path) as trace:
+        buffer = trace.read(chunk_size)
+        match = re.search(r'"traceEvents"\s*:\s*\[|^\s*\[', buffer)
+        if not match:
+            return
+        position = match.end()
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                event, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                more = trace.read(chunk_size)
+                if not more:
+                    return
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+            yield event
+            position = end
+            if position > chunk_size:
+                buffer, position = buffer[position:], 0
+
+
+def _union_length(intervals):
+    total, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _overlap(intervals, windows):
+    # Length of `windows` (already merged) that falls outside the busy `intervals`
+    total = 0.0
+    for window_start, window_end in windows:
+        busy = [(max(s, window_start), min(e, window_end)) for s, e in intervals if s < window_end and e > window_start]
+        total += (window_end - window_start) - _union_length(busy)
+    return total
+
+
+def analyse(path):
+    # One streaming pass: keep (ts, dur, name) of complete events per thread plus
+    # request start/finish times, then attribute self time on the renderer main thread(s)
+    threads, thread_names, requests = {}, {}, {}
+    first_ts, last_ts = None, None
+    for event in iter_trace_events(path):
+        phase, name = event.get("ph"), event.get("name")
+        key = (event.get("pid"), event.get("tid"))
+        if phase == "M" and name == "thread_name":
+            thread_names[key] = event.get("args", {}).get("name")
+            continue
+        ts = event.get("ts")
+        if ts is None:
+            continue
+        first_ts = ts if first_ts is None else min(first_ts, ts)
+        last_ts = max(last_ts or ts, ts + event.get("dur", 0))
+        if phase == "X":
+            threads.setdefault(key, []).append((ts, event.get("dur", 0), name))
+        data = event.get("args", {}).get("data", {}) or {}
+        if name == "ResourceSendRequest" and data.get("requestId"):
+            requests.setdefault(data["requestId"], [ts, None])
+        elif name in ("ResourceFinish", "ResourceReceiveResponse") and data.get("requestId") in requests:
+            requests[data["requestId"]][1] = ts
+
+    totals = {"scripting": 0.0, "style_layout": 0.0, "paint": 0.0, "loading": 0.0, "other": 0.0}
+    busy = []
+    main_threads = [key for key, thread in thread_names.items() if thread == "CrRendererMain"]
+    for key in main_threads:
+        stack = []  # (end, category, index into self_times)
+        events = sorted(threads.get(key, []), key=lambda e: (e[0], -e[1]))
+        self_times = []
+        for ts, dur, name in events:
+            while stack and ts >= stack[-1][0]:
+                stack.pop()
+            if not stack:
+                busy.append((ts, ts + dur))  # Top-level task
+            inherited = stack[-1][1] if stack else None
+            own = category(name) or inherited
+            self_times.append([own, dur])
+            if stack:
+                self_times[stack[-1][2]][1] -= dur
+            stack.append((ts + dur, own, len(self_times) - 1))
+        for own, self_time in self_times:
+            totals[own or "other"] += max(self_time, 0)
+
+    window = (last_ts - first_ts) if first_ts is not None else 0
+    pending = [(start, end if end is not None else last_ts) for start, end in requests.values()]
+    network_windows, current = [], None
+    for start, end in sorted(pending):
+        if current and start <= current[1]:
+            current[1] = max(current[1], end)
+        else:
+            current = [start, end]
+            network_windows.append(current)
+    network_idle = _overlap(busy, [tuple(w) for w in network_windows])
+    busy_total = _union_length(busy)
+    summary = {name: round(value / 1000, 1) for name, value in totals.items()}
+    summary.update({
+        "network_idle": round(network_idle / 1000, 1),
+        "idle": round(max(window - busy_total - network_idle, 0) / 1000, 1),
+        "window": round(window / 1000, 1),
+        "requests": len(requests),
+        "main_threads": len(main_threads),
+    })
+    return summary  # milliseconds
+
+
+def stream_trace(session, path):
+    # Tracing.end -> tracingComplete gives an IO stream handle; copy it to disk chunk by chunk
+    complete = session.expect("Tracing.tracingComplete")
+    session.send("Tracing.end")
+    handle = complete(timeout=120)["stream"]
+    written = 0
+    with open(path, "wb") as output:
+        while True:
+            chunk = session.send("IO.read", {"handle": handle, "size": READ_CHUNK})
+            data = base64.b64decode(chunk["data"]) if chunk.get("base64Encoded") else chunk["data"].encode()
+            output.write(data)
+            written += len(data)
+            if chunk.get("eof"):
+                break
+    session.send("IO.close", {"handle": handle})
+    return written
+
+
+def start_tracing(session):
+    session.send("Tracing.start", {
+        "transferMode": "ReturnAsStream",
+        "streamFormat": "json",
+        "traceConfig": {"includedCategories": TRACE_CATEGORIES, "recordMode": "recordAsMuchAsPossible"},
+    })
+
+
+def attach_summary(name, path, summary):
+    lines = [f"Trace: {os.path.abspath(path)} ({os.path.getsize(path) / 1024:.0f} KB, open in DevTools > Performance)"]
+    lines += [f"  {key:<14} {value:>10}" for key, value in summary.items()]
+    allure.attach("\n".join(lines), name=f"{name}_trace_summary", attachment_type=AttachmentType.TEXT)
+    allure.attach(json.dumps(summary, indent=2), name=f"{name}_trace_summary.json", attachment_type=AttachmentType.JSON)
+
+
+def trace_path(trace_dir, name):
+    # Milliseconds plus a per-process counter: the same step can be traced twice within a second
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+    return os.path.join(trace_dir, f"{name}-{stamp}-{next(_sequence)}.json")
+
+
+class Trace:
+    # A running trace of one page; stop() streams it to disk, analyses it and
+    # attaches the summary to the current Allure step
+    def __init__(self, driver, name, trace_dir="traces"):
+        os.makedirs(trace_dir, exist_ok=True)
+        self.name = name
+        self.path = trace_path(trace_dir, name)
+        self.summary = None
+        self.session = CdpSession.for_driver(driver)
+        try:
+            start_tracing(self.session)
+        except Exception:
+            self.session.close()
+            raise
+
+    def stop(self):
+        try:
+            stream_trace(self.session, self.path)
+        finally:
+            self.session.close()
+        self.summary = analyse(self.path)
+        attach_summary(self.name, self.path, self.summary)
+        return self.summary
+
+
+@contextlib.contextmanager
+def traced(driver, name, trace_dir="traces"):
+    # Wrap any block, e.g. `with traced(driver, "click_self_evaluation_button"): ...`
+    trace = Trace(driver, name, trace_dir)
+    try:
+        yield trace
+    finally:
+        trace.stop()
+
+
+class StepTracer:
+    # Step observer tracing the helpers named in --trace-steps
+    def __init__(self, steps, trace_dir="traces"):
+        self.steps = set(steps)
+        self.trace_dir = trace_dir
+        self.active = {}
+
+    def before_step(self, driver, name):
+        if name in self.steps and driver.session_id not in self.active:
+            self.active[driver.session_id] = (name, Trace(driver, name, self.trace_dir))
+
+    def after_step(self, driver, name, record, error):
+        active = self.active.get(driver.session_id)
+        if active and active[0] == name:
+            del self.active[driver.session_id]
+            record["trace_summary"] = active[1].stop()
+            record["trace"] = active[1].path
+
+
+def main():
+    import sys
+    print(json.dumps(analyse(sys.argv[1]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import ast
+import glob
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+import driver_daemon
+
+# Re-runs only the tests whose step helpers or module-level setup changed, against the daemon's warm browser.
+#   python watch_mode.py [test_script.py] [--interval 0.5] [-- extra pytest args]
+
+
+MODULE = "<module>"  # Top-level statements that are not definitions; every test depends on them
+
+
+def _keys(node):
+    # Names a top-level statement defines: functions and classes, assigned globals, and
+    # the object a bare call configures (app_states.add_transition(...) -> app_states)
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return []
+    if isinstance(node, ast.If) and any(isinstance(n, ast.Name) and n.id == "__name__" for n in ast.walk(node.test)):
+        return []  # The script entry point is not part of any test
+    targets = node.targets if isinstance(node, ast.Assign) else \
+        [node.target] if isinstance(node, (ast.AnnAssign, ast.AugAssign)) else None
+    if targets is not None:
+        return sorted({n.id for target in targets for n in ast.walk(target) if isinstance(n, ast.Name)})
+    if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+        func = node.value.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            return [func.value.id]
+    return [MODULE]
+
+
+def top_level(tree):
+    statements = {}
+    for node in tree.body:
+        for key in _keys(node):
+            statements.setdefault(key, []).append(node)
+    return statements
+
+
+def _segment(source, node):
+    # Decorators (e.g. @step titles) are part of a definition
+    return "\n".join(ast.get_source_segment(source, n) for n in getattr(node, "decorator_list", []) + [node])
+
+
+def statement_hashes(tree, source):
+    return {key: hashlib.sha1("\n".join(_segment(source, n) for n in nodes).encode()).hexdigest()
+            for key, nodes in top_level(tree).items()}
+
+
+def call_graph(tree):
+    # Names each top-level definition refers to: helpers it calls, constants such as
+    # PROFILE_FIELDS, objects configured at module level (app_states, whose
+    # add_transition calls in turn refer to the helpers passed to them) and fixtures
+    # requested as arguments
+    statements = top_level(tree)
+    graph = {}
+    for key, nodes in statements.items():
+        refs = set()
+        for node in nodes:
+            for n in ast.walk(node):
+                if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load):
+                    refs.add(n.id)
+                elif isinstance(n, ast.arg):
+                    refs.add(n.arg)
+        graph[key] = {r for r in refs if r in statements and r != key}
+    return graph
+
+
+def closure(graph, name):
+    seen, stack = set(), [name]
+    while stack:
+        for dep in graph.get(stack.pop(), ()):
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    return seen
+
+
+def map_tests(path):
+    source = open(path).read()
+    tree = ast.parse(source)
+    graph = call_graph(tree)
+    shared = closure(graph, MODULE) | {MODULE}
+    tests = {name: closure(graph, name) | {name} | shared for name in graph if name.startswith("test_")}
+    return tests, statement_hashes(tree, source)
+
+
+def affected_tests(tests, old_hashes, new_hashes):
+    changed = {name for name in new_hashes.keys() | old_hashes.keys()
+               if old_hashes.get(name) != new_hashes.get(name)}
+    return sorted(test for test, helpers in tests.items() if helpers & changed), changed
+
+
+def source_mtimes(directory):
+    return {path: os.stat(path).st_mtime for path in glob.glob(os.path.join(directory, "*.py"))}
+
+
+def run(test_file, selected, extra):
+    node_ids = [f"{test_file}::{name}" for name in selected] or [test_file]
+    command = [sys.executable, "-m", "pytest", *node_ids, "--daemon", *extra]
+    print(f"\n$ {' '.join(command)}")
+    subprocess.call(command)
+
+
+def ensure_daemon():
+    state = driver_daemon.read_state()
+    if state and driver_daemon.daemon_alive(state):
+        return None
+    print("Starting driver daemon")
+    daemon = subprocess.Popen([sys.executable, driver_daemon.__file__, "start", "--sign-in"])
+    while not (driver_daemon.read_state() and driver_daemon.daemon_alive(driver_daemon.read_state())):
+        if daemon.poll() is not None:
+            raise RuntimeError("Driver daemon exited during startup")
+        time.sleep(0.5)
+    return daemon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch sources and re-run affected tests on a warm browser")
+    parser.add_argument("test_file", nargs="?", default="test_script.py")
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Extra pytest arguments after --")
+    args = parser.parse_args()
+    extra = [a for a in args.pytest_args if a != "--"]
+
+    daemon = ensure_daemon()
+    directory = os.path.dirname(os.path.abspath(args.test_file))
+    test_path = os.path.abspath(args.test_file)
+    tests, hashes = map_tests(args.test_file)
+    mtimes = source_mtimes(directory)
+    print(f"Watching {len(mtimes)} files; {len(tests)} tests mapped to their step helpers")
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = source_mtimes(directory)
+            modified = [path for path, mtime in current.items() if mtimes.get(path) != mtime]
+            mtimes = current
+            if not modified:
+                continue
+            if modified == [test_path]:
+                try:
+                    new_tests, new_hashes = map_tests(args.test_file)
+                except SyntaxError as e:
+                    print(f"Syntax error, waiting for a fix: {e}")
+                    continue
+                selected, changed = affected_tests(new_tests, hashes, new_hashes)
+                tests, hashes = new_tests, new_hashes
+                if not selected:
+                    continue
+                print(f"Changed: {', '.join(sorted(changed))} -> {len(selected)} test(s)")
+                run(args.test_file, selected, extra)
+            else:
+                # A shared module changed; every test may be affected
+                print(f"Changed: {', '.join(os.path.basename(p) for p in modified)} -> all tests")
+                try:
+                    tests, hashes = map_tests(args.test_file)
+                except SyntaxError as e:
+                    print(f"Syntax error, waiting for a fix: {e}")
+                    continue
+                run(args.test_file, [], extra)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+
+
+if __name__ == "__main__":
+    main()